@@ -6,23 +6,188 @@ Protected by Entra ID (Azure AD) authentication.
 
 import logging
 import json
+import orjson
 import azure.functions as func
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, IndexModel
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
+from bson.errors import InvalidId
 import os
 from datetime import datetime
 import jwt
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 
-# Helper function to handle ObjectId serialization
-class JSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super(JSONEncoder, self).default(obj)
+# Try to load environment variables once, at cold start
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.info("Loaded environment variables from .env file")
+except ImportError:
+    logging.info("python-dotenv not installed, using environment variables directly")
+except Exception as e:
+    logging.warning(f"Could not load .env file: {str(e)}")
+
+# OIDC discovery documents and JWKS change rarely, so cache them per worker
+_DISCOVERY_TTL = 3600  # 1 hour
+_JWKS_TTL = 600  # 10 minutes
+_JWKS_MIN_REFRESH = 60  # an unknown kid refetches the JWKS at most this often (seconds)
+_DISCOVERY_CACHE: dict[str, tuple[float, dict]] = {}
+_JWKS_CACHE: dict[str, tuple[float, dict]] = {}
+_SIGNING_KEYS: dict[str, tuple[dict, dict[str, jwt.PyJWK]]] = {}  # tenant -> (jwks, {kid: key})
+_CACHE_LOCK = threading.Lock()
+
+# Verified token claims, keyed by a hash of the token (never the raw token)
+_TOKEN_CACHE_TTL = 60  # seconds
+_TOKEN_CACHE_MAXSIZE = 10000
+_TOKEN_CACHE: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Shared HTTP session so connections to the identity provider are pooled
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[429, 500, 502, 503, 504])
+))
+_HTTP_TIMEOUT = (2, 5)  # (connect, read) seconds
+
+# Database client is created once per worker and reused across invocations
+_MONGO_CLIENT: MongoClient | None = None
+_CUSTOMER_COLLECTION = None
+_MONGO_LOCK = threading.Lock()
+_EMAIL_UNIQUE_READY = False  # check for active duplicates before insert until the unique index exists
+
+# Helper functions to handle ObjectId serialization (orjson handles datetime natively)
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+# Query parameters that identify a single customer: (param, field, parser)
+_CUSTOMER_LOOKUPS = (
+    ("id", "_id", ObjectId),
+    ("email", "email", str),
+    ("entra_id", "entra_id", str),
+    ("phone_number", "phone_number", str),
+)
+
+# Default values for fields not provided when creating a customer: immutable scalars are
+# shared, while lists and dicts come from factories so each customer gets fresh ones
+_CUSTOMER_DEFAULTS = {
+    "is_active": True,
+    "loyalty_points": 0,
+    "loyalty_tier": "Standard",
+    "visit_count": 0,
+}
+_CUSTOMER_DEFAULT_FACTORIES = {
+    "dietary_preferences": list,
+    "allergens": list,
+    "favorite_restaurants": list,
+    "favorite_dishes": list,
+    "cuisine_preferences": list,
+    "order_history": list,
+    "reservations": list,
+    "payment_methods": list,
+    "tags": list,
+    "address": lambda: {
+        "street": "",
+        "city": "",
+        "state": "",
+        "country": "",
+        "postal_code": ""
+    },
+    "marketing_preferences": lambda: {
+        "email": False,
+        "sms": False,
+        "push": False
+    },
+    "custom_fields": dict,
+}
+
+# Compound indexes matching the active-customer lookup and list filters
+_CUSTOMER_INDEXES = [
+    IndexModel([("email", 1), ("is_active", 1)]),
+    IndexModel([("entra_id", 1), ("is_active", 1)]),
+    IndexModel([("phone_number", 1), ("is_active", 1)]),
+    IndexModel([("is_active", 1), ("loyalty_tier", 1)]),
+]
+
+# Projection that keeps sensitive fields from ever leaving the database
+_PUBLIC_PROJECTION = {"password": 0}
+
+def _get_cached(url, cache, ttl, key=None):
+    """Fetch a JSON document, reusing a cached copy while it is fresh"""
+    key = key or url
+    with _CACHE_LOCK:
+        entry = cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        
+        response = _HTTP.get(url, timeout=_HTTP_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        cache[key] = (time.monotonic(), data)
+        return data
+
+def _expire_cached(cache, key, min_age):
+    """Drop a cached document so the next fetch refreshes it, unless it is younger than min_age seconds"""
+    with _CACHE_LOCK:
+        entry = cache.get(key)
+        if entry and time.monotonic() - entry[0] < min_age:
+            return False
+        cache.pop(key, None)
+        return True
+
+def _get_signing_key(tenant_id, jwks_data, kid):
+    """Look up a parsed signing key by kid, parsing the JWKS once per fetch"""
+    with _CACHE_LOCK:
+        entry = _SIGNING_KEYS.get(tenant_id)
+        if entry is None or entry[0] is not jwks_data:
+            keys = {}
+            for jwk in jwks_data.get('keys', []):
+                if 'kid' not in jwk:
+                    continue
+                try:
+                    keys[jwk['kid']] = jwt.PyJWK(jwk)
+                except jwt.PyJWKError:
+                    continue
+            entry = (jwks_data, keys)
+            _SIGNING_KEYS[tenant_id] = entry
+        return entry[1].get(kid)
+
+def _get_cached_claims(token_key):
+    """Return cached claims for a token if they are still valid"""
+    with _TOKEN_CACHE_LOCK:
+        entry = _TOKEN_CACHE.get(token_key)
+        if not entry:
+            return None
+        
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del _TOKEN_CACHE[token_key]
+            return None
+        
+        _TOKEN_CACHE.move_to_end(token_key)
+        return claims
+
+def _cache_claims(token_key, claims):
+    """Store verified claims until the token expires or the cache TTL elapses"""
+    expires_at = min(claims.get("exp", 0), time.time() + _TOKEN_CACHE_TTL)
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE[token_key] = (expires_at, claims)
+        _TOKEN_CACHE.move_to_end(token_key)
+        while len(_TOKEN_CACHE) > _TOKEN_CACHE_MAXSIZE:
+            _TOKEN_CACHE.popitem(last=False)
 
 def validate_token(req):
     """Validate the Entra ID access token from the request"""
@@ -32,12 +197,19 @@ def validate_token(req):
         if not auth_header:
             return None, "Authorization header is missing"
         
-        # Extract the token
-        token_parts = auth_header.split()
-        if len(token_parts) != 2 or token_parts[0].lower() != 'bearer':
+        # Extract the token (prefix check avoids splitting the header)
+        if len(auth_header) <= 7 or auth_header[:7].lower() != 'bearer ':
             return None, "Invalid authorization format. Expected 'Bearer {token}'"
         
-        token = token_parts[1]
+        token = auth_header[7:].strip()
+        if not token:
+            return None, "Invalid authorization format. Expected 'Bearer {token}'"
+        
+        # Skip signature verification for recently verified tokens
+        token_key = hashlib.sha256(token.encode()).digest()
+        cached_claims = _get_cached_claims(token_key)
+        if cached_claims is not None:
+            return cached_claims, None
         
         # Get tenant ID from environment
         tenant_id = os.environ.get('AZURE_TENANT_ID')
@@ -50,24 +222,36 @@ def validate_token(req):
         
         # Get OIDC discovery document to get the signing keys
         discovery_url = f"{issuer}/.well-known/openid-configuration"
-        discovery_response = requests.get(discovery_url)
-        discovery_data = discovery_response.json()
+        discovery_data = _get_cached(discovery_url, _DISCOVERY_CACHE, _DISCOVERY_TTL, tenant_id)
         jwks_uri = discovery_data['jwks_uri']
         
         # Get the signing keys
-        jwks_response = requests.get(jwks_uri)
-        jwks_data = jwks_response.json()
+        jwks_data = _get_cached(jwks_uri, _JWKS_CACHE, _JWKS_TTL, tenant_id)
+        
+        # Pick the single key the token was signed with
+        kid = jwt.get_unverified_header(token).get('kid')
+        signing_key = _get_signing_key(tenant_id, jwks_data, kid)
+        
+        # An unknown kid may mean the keys were rotated, so refetch the JWKS once (rate-limited)
+        if signing_key is None and _expire_cached(_JWKS_CACHE, tenant_id, _JWKS_MIN_REFRESH):
+            jwks_data = _get_cached(jwks_uri, _JWKS_CACHE, _JWKS_TTL, tenant_id)
+            signing_key = _get_signing_key(tenant_id, jwks_data, kid)
+        if signing_key is None:
+            return None, "Invalid token: signing key not found"
         
         # Validate the token
         decoded_token = jwt.decode(
             token,
-            jwks_data,
+            signing_key.key,
             algorithms=['RS256'],
             audience=audience,
             issuer=issuer,
-            options={"verify_signature": True}
+            options={"verify_signature": True, "require": ["exp", "aud", "iss"]}
         )
         
+        # Only successful verifications are cached
+        _cache_claims(token_key, decoded_token)
+        
         return decoded_token, None
     
     except jwt.ExpiredSignatureError:
@@ -78,9 +262,58 @@ def validate_token(req):
         logging.error(f"Error validating token: {str(e)}")
         return None, f"Error validating token: {str(e)}"
 
-def require_auth(func):
+def _get_collection():
+    """Return the customer collection, connecting to the database on first use"""
+    global _MONGO_CLIENT, _CUSTOMER_COLLECTION, _EMAIL_UNIQUE_READY
+    
+    if _CUSTOMER_COLLECTION is not None:
+        return _CUSTOMER_COLLECTION
+    
+    with _MONGO_LOCK:
+        if _MONGO_CLIENT is None:
+            # Load database connection details
+            cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
+            database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
+            customer_container = os.environ.get("CUSTOMER_CONTAINER", "Customers")
+            
+            if not cosmos_db_connection_string:
+                return None
+            
+            # Connect to database; the pool is shared by concurrent invocations on the worker's threads
+            _MONGO_CLIENT = MongoClient(
+                cosmos_db_connection_string,
+                maxPoolSize=50,
+                socketTimeoutMS=30000,
+                connectTimeoutMS=30000
+            )
+            collection = _MONGO_CLIENT[database_name][customer_container]
+            
+            # Ensure indexes backing the lookup and list queries exist (idempotent)
+            try:
+                collection.create_indexes(_CUSTOMER_INDEXES)
+            except Exception as e:
+                logging.warning(f"Failed to create customer indexes: {str(e)}")
+            
+            # Created separately so a rejected unique index doesn't block the lookup indexes. Only active
+            # customers must be unique, so a soft-deleted customer's email can be registered again
+            try:
+                collection.create_index(
+                    "email",
+                    unique=True,
+                    partialFilterExpression={"is_active": True},
+                    name="email_active_unique"
+                )
+                _EMAIL_UNIQUE_READY = True
+            except Exception as e:
+                logging.error(f"Failed to create unique customer email index, checking emails before insert instead: {str(e)}")
+            
+            _CUSTOMER_COLLECTION = collection
+    
+    return _CUSTOMER_COLLECTION
+
+def require_auth(handler):
     """Decorator to require authentication for an endpoint"""
-    @wraps(func)
+    @wraps(handler)
     def wrapper(req, collection):
         # Validate the token
         token_data, error = validate_token(req)
@@ -96,7 +329,7 @@ def require_auth(func):
         req.token_data = token_data
         
         # Call the original function
-        return func(req, collection)
+        return handler(req, collection)
     
     return wrapper
 
@@ -104,56 +337,30 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('Processing customer CRUD operation.')
     
     try:
-        # Try to load environment variables
-        try:
-            from dotenv import load_dotenv
-            load_dotenv()
-            logging.info("Loaded environment variables from .env file")
-        except ImportError:
-            logging.info("python-dotenv not installed, using environment variables directly")
-        except Exception as e:
-            logging.warning(f"Could not load .env file: {str(e)}")
-        
-        # Load database connection details
-        cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
-        database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
-        customer_container = os.environ.get("CUSTOMER_CONTAINER", "Customers")
-        
-        if not cosmos_db_connection_string:
+        # Get the (cached) database collection
+        customer_collection = _get_collection()
+        
+        if customer_collection is None:
             return func.HttpResponse(
                 json.dumps({"error": "Database connection string is not configured"}),
                 status_code=500,
                 mimetype="application/json"
             )
         
-        # Connect to database
-        client = MongoClient(
-            cosmos_db_connection_string,
-            socketTimeoutMS=30000,
-            connectTimeoutMS=30000
-        )
-        database = client[database_name]
-        customer_collection = database[customer_container]
-        
         # Get operation type from route or query parameter
         route = req.route_params.get('operation', '')
         operation = route if route else req.params.get('operation', 'get')
         
         # Handle different CRUD operations
-        if req.method == 'POST' and operation.lower() == 'create':
-            return create_customer(req, customer_collection)
-        elif req.method == 'GET' and operation.lower() == 'get':
-            return get_customer(req, customer_collection)
-        elif req.method == 'PUT' and operation.lower() == 'update':
-            return update_customer(req, customer_collection)
-        elif req.method == 'DELETE' and operation.lower() == 'delete':
-            return delete_customer(req, customer_collection)
-        else:
+        handler = _DISPATCH.get((req.method, operation.lower()))
+        if handler is None:
             return func.HttpResponse(
                 json.dumps({"error": f"Unsupported operation: {operation}"}),
                 status_code=400,
                 mimetype="application/json"
             )
+        
+        return handler(req, customer_collection)
     
     except Exception as e:
         logging.error(f"Error processing customer operation: {str(e)}")
@@ -191,59 +398,38 @@ def create_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
             req_body["entra_id"] = req.token_data.get("oid")
             req_body["user_principal_name"] = req.token_data.get("preferred_username")
         
-        # Set default values if not provided
-        if "is_active" not in req_body:
-            req_body["is_active"] = True
-        if "loyalty_points" not in req_body:
-            req_body["loyalty_points"] = 0
-        if "loyalty_tier" not in req_body:
-            req_body["loyalty_tier"] = "Standard"
-        if "visit_count" not in req_body:
-            req_body["visit_count"] = 0
-        
-        # Initialize empty arrays and objects for relationship fields
-        for field in ["dietary_preferences", "allergens", "favorite_restaurants", 
-                     "favorite_dishes", "cuisine_preferences", "order_history", 
-                     "reservations", "payment_methods", "tags"]:
+        # Fill in defaults for any fields that were not provided (building only the missing containers)
+        req_body = {**_CUSTOMER_DEFAULTS, **req_body}
+        for field, factory in _CUSTOMER_DEFAULT_FACTORIES.items():
             if field not in req_body:
-                req_body[field] = []
-        
-        # Initialize nested objects
-        if "address" not in req_body:
-            req_body["address"] = {
-                "street": "",
-                "city": "",
-                "state": "",
-                "country": "",
-                "postal_code": ""
-            }
-        
-        if "marketing_preferences" not in req_body:
-            req_body["marketing_preferences"] = {
-                "email": False,
-                "sms": False,
-                "push": False
-            }
-        
-        if "custom_fields" not in req_body:
-            req_body["custom_fields"] = {}
+                req_body[field] = factory()
         
-        # Create the customer
-        result = collection.insert_one(req_body)
+        # Without the unique index, look for an active customer with this email first
+        if not _EMAIL_UNIQUE_READY and collection.find_one({"email": req_body["email"], "is_active": True}, {"_id": 1}):
+            return func.HttpResponse(
+                json.dumps({"error": "A customer with this email already exists"}),
+                status_code=409,
+                mimetype="application/json"
+            )
         
-        # Get created customer with _id
-        created_customer = collection.find_one({"_id": result.inserted_id})
+        # Create the customer
+        collection.insert_one(req_body)
         
-        # Remove sensitive information before returning
-        if "password" in created_customer:
-            del created_customer["password"]
+        # insert_one has set _id on req_body, so return it without re-reading
+        req_body.pop("password", None)
         
         return func.HttpResponse(
-            json.dumps({"message": "Customer created successfully", "customer": created_customer}, cls=JSONEncoder),
+            _dumps({"message": "Customer created successfully", "customer": req_body}),
             status_code=201,
             mimetype="application/json"
         )
     
+    except DuplicateKeyError:
+        return func.HttpResponse(
+            json.dumps({"error": "A customer with this email already exists"}),
+            status_code=409,
+            mimetype="application/json"
+        )
     except ValueError:
         return func.HttpResponse(
             json.dumps({"error": "Invalid request body. Please provide valid JSON."}),
@@ -260,45 +446,29 @@ def create_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
 
 @require_auth
 def get_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
-    """Get customer(s) by ID, email, or entra_id"""
+    """Get customer(s) by ID, email, entra_id, or phone number"""
     try:
-        # Check for identification parameters
-        customer_id = req.params.get('id')
-        email = req.params.get('email')
-        entra_id = req.params.get('entra_id')
-        phone = req.params.get('phone_number')
-        
-        # If an ID was provided, get customer by ID
-        if customer_id:
+        # Use the first identifying parameter that was provided, if any
+        lookup = None
+        for param, field, parse in _CUSTOMER_LOOKUPS:
+            value = req.params.get(param)
+            if value:
+                lookup = (field, parse, value)
+                break
+        
+        # If an identifier was provided, get a single customer by it
+        if lookup:
+            field, parse, value = lookup
             try:
-                customer = collection.find_one({"_id": ObjectId(customer_id), "is_active": True})
-            except:
+                value = parse(value)
+            except (InvalidId, TypeError):
                 return func.HttpResponse(
                     json.dumps({"error": "Invalid customer ID format"}),
                     status_code=400,
                     mimetype="application/json"
                 )
             
-            if not customer:
-                return func.HttpResponse(
-                    json.dumps({"error": "Customer not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Remove sensitive information
-            if "password" in customer:
-                del customer["password"]
-            
-            return func.HttpResponse(
-                json.dumps({"customer": customer}, cls=JSONEncoder),
-                status_code=200,
-                mimetype="application/json"
-            )
-        
-        # If email was provided, get customer by email
-        elif email:
-            customer = collection.find_one({"email": email, "is_active": True})
+            customer = collection.find_one({field: value, "is_active": True}, _PUBLIC_PROJECTION)
             
             if not customer:
                 return func.HttpResponse(
@@ -307,54 +477,8 @@ def get_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
                     mimetype="application/json"
                 )
             
-            # Remove sensitive information
-            if "password" in customer:
-                del customer["password"]
-            
             return func.HttpResponse(
-                json.dumps({"customer": customer}, cls=JSONEncoder),
-                status_code=200,
-                mimetype="application/json"
-            )
-        
-        # If entra_id was provided, get customer by entra_id
-        elif entra_id:
-            customer = collection.find_one({"entra_id": entra_id, "is_active": True})
-            
-            if not customer:
-                return func.HttpResponse(
-                    json.dumps({"error": "Customer not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Remove sensitive information
-            if "password" in customer:
-                del customer["password"]
-            
-            return func.HttpResponse(
-                json.dumps({"customer": customer}, cls=JSONEncoder),
-                status_code=200,
-                mimetype="application/json"
-            )
-            
-        # If phone number was provided, get customer by phone
-        elif phone:
-            customer = collection.find_one({"phone_number": phone, "is_active": True})
-            
-            if not customer:
-                return func.HttpResponse(
-                    json.dumps({"error": "Customer not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Remove sensitive information
-            if "password" in customer:
-                del customer["password"]
-            
-            return func.HttpResponse(
-                json.dumps({"customer": customer}, cls=JSONEncoder),
+                _dumps({"customer": customer}),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -380,23 +504,25 @@ def get_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
             if dietary_preference:
                 query["dietary_preferences"] = dietary_preference
             
-            # Execute query with pagination
-            customers = list(collection.find(query).skip(skip).limit(limit))
-            total_count = collection.count_documents(query)
-            
-            # Remove sensitive information from all customers
-            for customer in customers:
-                if "password" in customer:
-                    del customer["password"]
+            # Fetch the page and the total count in a single round-trip
+            result = next(collection.aggregate([
+                {"$match": query},
+                {"$facet": {
+                    "data": [{"$skip": skip}, {"$limit": limit}, {"$project": _PUBLIC_PROJECTION}],
+                    "total": [{"$count": "n"}]
+                }}
+            ]), {})
+            customers = result.get("data", [])
+            total_count = result["total"][0]["n"] if result.get("total") else 0
             
             return func.HttpResponse(
-                json.dumps({
+                _dumps({
                     "customers": customers,
                     "count": len(customers),
                     "total_count": total_count,
                     "page": page,
                     "total_pages": (total_count + limit - 1) // limit
-                }, cls=JSONEncoder),
+                }),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -423,6 +549,16 @@ def update_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
+        # Parse the customer ID once and reuse it
+        try:
+            oid = ObjectId(customer_id)
+        except (InvalidId, TypeError):
+            return func.HttpResponse(
+                json.dumps({"error": "Invalid customer ID format"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
         # Get request body
         req_body = req.get_json()
         
@@ -431,58 +567,41 @@ def update_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
         req_body["updated_by"] = req.token_data.get("preferred_username", "unknown")
         
         # Remove _id if present (can't update _id)
-        if "_id" in req_body:
-            del req_body["_id"]
+        req_body.pop("_id", None)
         
         # Don't allow direct updates to sensitive fields
         protected_fields = ["password", "entra_id", "created_at", "created_by"]
         for field in protected_fields:
-            if field in req_body:
-                del req_body[field]
-        
-        try:
-            # Check if customer exists
-            existing_customer = collection.find_one({"_id": ObjectId(customer_id)})
-            if not existing_customer:
-                return func.HttpResponse(
-                    json.dumps({"error": "Customer not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Update the customer
-            result = collection.update_one(
-                {"_id": ObjectId(customer_id)},
-                {"$set": req_body}
-            )
-            
-            if result.modified_count > 0:
-                # Get updated customer
-                updated_customer = collection.find_one({"_id": ObjectId(customer_id)})
-                
-                # Remove sensitive information
-                if "password" in updated_customer:
-                    del updated_customer["password"]
-                
-                return func.HttpResponse(
-                    json.dumps({"message": "Customer updated successfully", "customer": updated_customer}, cls=JSONEncoder),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "No changes made to customer"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
+            req_body.pop(field, None)
+        
+        # Update the customer and get the updated document in one round-trip
+        updated_customer = collection.find_one_and_update(
+            {"_id": oid},
+            {"$set": req_body},
+            projection=_PUBLIC_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
         
-        except:
+        if not updated_customer:
             return func.HttpResponse(
-                json.dumps({"error": "Invalid customer ID format"}),
-                status_code=400,
+                json.dumps({"error": "Customer not found"}),
+                status_code=404,
                 mimetype="application/json"
             )
+        
+        return func.HttpResponse(
+            _dumps({"message": "Customer updated successfully", "customer": updated_customer}),
+            status_code=200,
+            mimetype="application/json"
+        )
     
+    except DuplicateKeyError:
+        # The new email, or a reactivated customer's email, belongs to another active customer
+        return func.HttpResponse(
+            json.dumps({"error": "A customer with this email already exists"}),
+            status_code=409,
+            mimetype="application/json"
+        )
     except ValueError:
         return func.HttpResponse(
             json.dumps({"error": "Invalid request body. Please provide valid JSON."}),
@@ -511,46 +630,50 @@ def delete_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
+        # Parse the customer ID once and reuse it
         try:
-            # Check if customer exists
-            existing_customer = collection.find_one({"_id": ObjectId(customer_id)})
-            if not existing_customer:
-                return func.HttpResponse(
-                    json.dumps({"error": "Customer not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Soft delete (mark as inactive) with user info
-            result = collection.update_one(
-                {"_id": ObjectId(customer_id)},
-                {
-                    "$set": {
-                        "is_active": False,
-                        "updated_at": datetime.utcnow().isoformat(),
-                        "deleted_by": req.token_data.get("preferred_username", "unknown"),
-                        "deleted_at": datetime.utcnow().isoformat()
-                    }
+            oid = ObjectId(customer_id)
+        except (InvalidId, TypeError):
+            return func.HttpResponse(
+                json.dumps({"error": "Invalid customer ID format"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
+        # Soft delete (mark as inactive) with user info, returning the
+        # prior active flag so we know whether it was already deleted
+        current_time = datetime.utcnow().isoformat()
+        previous_customer = collection.find_one_and_update(
+            {"_id": oid},
+            {
+                "$set": {
+                    "is_active": False,
+                    "updated_at": current_time,
+                    "deleted_by": req.token_data.get("preferred_username", "unknown"),
+                    "deleted_at": current_time
                 }
+            },
+            projection={"is_active": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        if not previous_customer:
+            return func.HttpResponse(
+                json.dumps({"error": "Customer not found"}),
+                status_code=404,
+                mimetype="application/json"
             )
-            
-            if result.modified_count > 0:
-                return func.HttpResponse(
-                    json.dumps({"message": "Customer deleted successfully"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "Customer was already marked as deleted"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
         
-        except:
+        if previous_customer.get("is_active", True):
             return func.HttpResponse(
-                json.dumps({"error": "Invalid customer ID format"}),
-                status_code=400,
+                json.dumps({"message": "Customer deleted successfully"}),
+                status_code=200,
+                mimetype="application/json"
+            )
+        else:
+            return func.HttpResponse(
+                json.dumps({"message": "Customer was already marked as deleted"}),
+                status_code=200,
                 mimetype="application/json"
             )
     
@@ -560,4 +683,12 @@ def delete_customer(req: func.HttpRequest, collection) -> func.HttpResponse:
             json.dumps({"error": f"Failed to delete customer: {str(e)}"}),
             status_code=500,
             mimetype="application/json"
-        )
\ No newline at end of file
+        )
+
+# Map (HTTP method, operation) to the handler for that CRUD operation
+_DISPATCH = {
+    ("POST", "create"): create_customer,
+    ("GET", "get"): get_customer,
+    ("PUT", "update"): update_customer,
+    ("DELETE", "delete"): delete_customer,
+}
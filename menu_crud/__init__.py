@@ -6,23 +6,187 @@ Protected by Entra ID (Azure AD) authentication.
 
 import logging
 import json
+import orjson
 import azure.functions as func
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, IndexModel
 from bson import ObjectId
 import os
 from datetime import datetime
 import jwt
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 
-# Helper function to handle ObjectId serialization
-class JSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super(JSONEncoder, self).default(obj)
+# Try to load environment variables once, at cold start
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.info("Loaded environment variables from .env file")
+except ImportError:
+    logging.info("python-dotenv not installed, using environment variables directly")
+except Exception as e:
+    logging.warning(f"Could not load .env file: {str(e)}")
+
+# Token validation parameters, read once per worker
+_TENANT_ID = os.environ.get('AZURE_TENANT_ID')
+_AUDIENCE = os.environ.get('AZURE_APP_AUDIENCE')
+_ISSUER = f"https://login.microsoftonline.com/{_TENANT_ID}/v2.0"
+_DISCOVERY_URL = f"{_ISSUER}/.well-known/openid-configuration"
+
+# OIDC discovery documents and signing keys change rarely, so cache them per worker
+_DISCOVERY_TTL = 3600  # 1 hour
+_JWKS_LIFESPAN = 3600  # 1 hour
+_DISCOVERY_CACHE: dict[str, tuple[float, dict]] = {}
+_JWK_CLIENTS: dict[str, jwt.PyJWKClient] = {}  # jwks_uri -> client with its own key cache
+_CACHE_LOCK = threading.Lock()
+
+# Shared HTTP session so connections to the identity provider are pooled
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+))
+_HTTP_TIMEOUT = 3  # seconds
+
+# Verified token claims, keyed by a hash of the token (never the raw token)
+_TOKEN_CACHE_TTL = 300  # seconds
+_TOKEN_CACHE_MAXSIZE = 4096
+_TOKEN_EXP_LEEWAY = 5  # treat tokens this close to expiry as a miss
+_TOKEN_CACHE: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Database client is created once per worker and reused across invocations
+_MONGO_CLIENT: MongoClient | None = None
+_MENU_COLLECTION = None
+_MONGO_LOCK = threading.Lock()
+
+# Indexes backing the restaurant lookup and the active-menu listing
+_MENU_INDEXES = [
+    IndexModel([("restaurant_id", 1), ("is_active", 1)], name="restaurant_active"),
+    IndexModel([("is_active", 1), ("_id", -1)], name="active_id"),
+]
+_MENU_INDEXES_READY = False  # only hint indexes we know exist
+
+# Fields a new menu must include
+_REQUIRED_CREATE_FIELDS = frozenset(("name", "restaurant_id"))
+
+# Fixed error responses, serialized once: key -> (status code, body)
+_ERRORS = {
+    key: (status, json.dumps({"error": message}).encode())
+    for key, status, message in (
+        ("no_db_config", 500, "Database connection string is not configured"),
+        ("bad_body", 400, "Invalid request body. Please provide valid JSON."),
+        ("bad_menu_id", 400, "Invalid menu ID format"),
+        ("menu_not_found", 404, "Menu not found"),
+        ("no_update_id", 400, "Menu ID is required for update"),
+        ("no_delete_id", 400, "Menu ID is required for deletion"),
+    )
+}
+
+# Bodies for the authentication failures whose message never varies
+_AUTH_ERRORS = {
+    message: json.dumps({"error": message, "authenticated": False}).encode()
+    for message in (
+        "Authorization header is missing",
+        "Invalid authorization format. Expected 'Bearer {token}'",
+        "Tenant ID is not configured",
+        "Token has expired",
+    )
+}
+
+def _err(key):
+    """Return one of the precomputed error responses"""
+    status, body = _ERRORS[key]
+    return func.HttpResponse(body, status_code=status, mimetype="application/json")
+
+# Helper functions to handle ObjectId serialization (orjson handles datetime natively)
+def _default(obj):
+    # Exact type check first: ObjectId is by far the most common unknown type
+    if type(obj) is ObjectId or isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def _dumps_menus(cursor, **fields):
+    """Serialize menus straight from a cursor, without building an intermediate list"""
+    body = bytearray(b'{"menus":[')
+    count = 0
+    last_id = None
+    for menu in cursor:
+        if count:
+            body += b","
+        body += _dumps(menu)
+        last_id = menu["_id"]
+        count += 1
+    
+    # Append count and any extra fields (which may depend on the count/last id)
+    fields = {"count": count, **{k: v(count, last_id) if callable(v) else v for k, v in fields.items()}}
+    body += b"]," + _dumps(fields)[1:]
+    return bytes(body)
+
+def _load_body(req):
+    """Parse the JSON request body (orjson.JSONDecodeError is a ValueError)"""
+    return orjson.loads(req.get_body())
+
+def _list_projection(req):
+    """Build the projection for list views from ?fields=, excluding the bulky arrays by default"""
+    fields = [f.strip() for f in req.params.get('fields', '').split(",") if f.strip()]
+    return {f: 1 for f in fields} or {"items": 0, "categories": 0}
+
+def _get_cached(url, cache, ttl, key=None):
+    """Fetch a JSON document, reusing a cached copy while it is fresh"""
+    key = key or url
+    with _CACHE_LOCK:
+        entry = cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        
+        response = _HTTP.get(url, timeout=_HTTP_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        cache[key] = (time.monotonic(), data)
+        return data
+
+def _get_jwk_client(jwks_uri):
+    """Return the shared PyJWKClient for a JWKS URI, creating it on first use"""
+    with _CACHE_LOCK:
+        client = _JWK_CLIENTS.get(jwks_uri)
+        if client is None:
+            client = jwt.PyJWKClient(jwks_uri, cache_keys=True, lifespan=_JWKS_LIFESPAN, timeout=_HTTP_TIMEOUT)
+            _JWK_CLIENTS[jwks_uri] = client
+        return client
+
+def _get_cached_claims(token_key):
+    """Return cached claims for a token if they are still valid"""
+    with _TOKEN_CACHE_LOCK:
+        entry = _TOKEN_CACHE.get(token_key)
+        if not entry:
+            return None
+        
+        expires_at, claims = entry
+        if expires_at <= time.time() + _TOKEN_EXP_LEEWAY:
+            del _TOKEN_CACHE[token_key]
+            return None
+        
+        _TOKEN_CACHE.move_to_end(token_key)
+        return claims
+
+def _cache_claims(token_key, claims):
+    """Store verified claims until the token expires or the cache TTL elapses"""
+    expires_at = min(claims.get("exp", 0), time.time() + _TOKEN_CACHE_TTL)
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE[token_key] = (expires_at, claims)
+        _TOKEN_CACHE.move_to_end(token_key)
+        while len(_TOKEN_CACHE) > _TOKEN_CACHE_MAXSIZE:
+            _TOKEN_CACHE.popitem(last=False)
 
 def validate_token(req):
     """Validate the Entra ID access token from the request"""
@@ -39,55 +203,100 @@ def validate_token(req):
         
         token = token_parts[1]
         
-        # Get tenant ID from environment
-        tenant_id = os.environ.get('AZURE_TENANT_ID')
-        if not tenant_id:
-            return None, "Tenant ID is not configured"
+        # Skip signature verification for recently verified tokens
+        token_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached_claims = _get_cached_claims(token_key)
+        if cached_claims is not None:
+            return cached_claims, None
         
-        # Get token validation parameters from environment
-        audience = os.environ.get('AZURE_APP_AUDIENCE')
-        issuer = f"https://login.microsoftonline.com/{tenant_id}/v2.0"
+        if not _TENANT_ID:
+            return None, "Tenant ID is not configured"
         
         # Get OIDC discovery document to get the signing keys
-        discovery_url = f"{issuer}/.well-known/openid-configuration"
-        discovery_response = requests.get(discovery_url)
-        discovery_data = discovery_response.json()
+        discovery_data = _get_cached(_DISCOVERY_URL, _DISCOVERY_CACHE, _DISCOVERY_TTL, _TENANT_ID)
         jwks_uri = discovery_data['jwks_uri']
         
-        # Get the signing keys
-        jwks_response = requests.get(jwks_uri)
-        jwks_data = jwks_response.json()
+        # Get the signing key for the token (the client refetches the JWKS on an unknown kid)
+        signing_key = _get_jwk_client(jwks_uri).get_signing_key_from_jwt(token)
         
         # Validate the token
         decoded_token = jwt.decode(
             token,
-            jwks_data,
+            signing_key.key,
             algorithms=['RS256'],
-            audience=audience,
-            issuer=issuer,
+            audience=_AUDIENCE,
+            issuer=_ISSUER,
             options={"verify_signature": True}
         )
         
+        # Only successful verifications are cached
+        _cache_claims(token_key, decoded_token)
+        
         return decoded_token, None
     
     except jwt.ExpiredSignatureError:
         return None, "Token has expired"
     except jwt.InvalidTokenError as e:
         return None, f"Invalid token: {str(e)}"
+    except jwt.PyJWKClientConnectionError as e:
+        logging.error(f"Error fetching signing keys: {str(e)}")
+        return None, f"Error validating token: {str(e)}"
+    except jwt.PyJWKClientError as e:
+        return None, f"Invalid token: {str(e)}"
     except Exception as e:
         logging.error(f"Error validating token: {str(e)}")
         return None, f"Error validating token: {str(e)}"
 
-def require_auth(func):
+def _get_collection():
+    """Return the menu collection, connecting to the database on first use"""
+    global _MONGO_CLIENT, _MENU_COLLECTION, _MENU_INDEXES_READY
+    
+    if _MENU_COLLECTION is not None:
+        return _MENU_COLLECTION
+    
+    with _MONGO_LOCK:
+        if _MONGO_CLIENT is None:
+            # Load database connection details
+            cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
+            database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
+            menu_container = os.environ.get("MENU_CONTAINER", "Menus")
+            
+            if not cosmos_db_connection_string:
+                return None
+            
+            # Connect to database; the pool is shared by concurrent invocations on the
+            # worker's threads, and a saturated pool fails fast instead of hanging
+            _MONGO_CLIENT = MongoClient(
+                cosmos_db_connection_string,
+                maxPoolSize=50,
+                waitQueueTimeoutMS=5000,
+                socketTimeoutMS=30000,
+                connectTimeoutMS=30000
+            )
+            collection = _MONGO_CLIENT[database_name][menu_container]
+            
+            # Ensure indexes exist (idempotent)
+            try:
+                collection.create_indexes(_MENU_INDEXES)
+                _MENU_INDEXES_READY = True
+            except Exception as e:
+                logging.warning(f"Failed to create menu indexes: {str(e)}")
+            
+            _MENU_COLLECTION = collection
+    
+    return _MENU_COLLECTION
+
+def require_auth(handler):
     """Decorator to require authentication for an endpoint"""
-    @wraps(func)
+    @wraps(handler)
     def wrapper(req, collection):
         # Validate the token
         token_data, error = validate_token(req)
         
         if error:
+            body = _AUTH_ERRORS.get(error) or json.dumps({"error": error, "authenticated": False})
             return func.HttpResponse(
-                json.dumps({"error": error, "authenticated": False}),
+                body,
                 status_code=401,
                 mimetype="application/json"
             )
@@ -96,7 +305,7 @@ def require_auth(func):
         req.token_data = token_data
         
         # Call the original function
-        return func(req, collection)
+        return handler(req, collection)
     
     return wrapper
 
@@ -104,56 +313,26 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('Processing menu CRUD operation.')
     
     try:
-        # Try to load environment variables
-        try:
-            from dotenv import load_dotenv
-            load_dotenv()
-            logging.info("Loaded environment variables from .env file")
-        except ImportError:
-            logging.info("python-dotenv not installed, using environment variables directly")
-        except Exception as e:
-            logging.warning(f"Could not load .env file: {str(e)}")
-        
-        # Load database connection details
-        cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
-        database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
-        menu_container = os.environ.get("MENU_CONTAINER", "Menus")
-        
-        if not cosmos_db_connection_string:
-            return func.HttpResponse(
-                json.dumps({"error": "Database connection string is not configured"}),
-                status_code=500,
-                mimetype="application/json"
-            )
+        # Reuse the worker's database connection
+        menu_collection = _get_collection()
         
-        # Connect to database
-        client = MongoClient(
-            cosmos_db_connection_string,
-            socketTimeoutMS=30000,
-            connectTimeoutMS=30000
-        )
-        database = client[database_name]
-        menu_collection = database[menu_container]
+        if menu_collection is None:
+            return _err("no_db_config")
         
         # Get operation type from route or query parameter
         route = req.route_params.get('operation', '')
         operation = route if route else req.params.get('operation', 'get')
         
         # Handle different CRUD operations
-        if req.method == 'POST' and operation.lower() == 'create':
-            return create_menu(req, menu_collection)
-        elif req.method == 'GET' and operation.lower() == 'get':
-            return get_menu(req, menu_collection)
-        elif req.method == 'PUT' and operation.lower() == 'update':
-            return update_menu(req, menu_collection)
-        elif req.method == 'DELETE' and operation.lower() == 'delete':
-            return delete_menu(req, menu_collection)
-        else:
+        handler = _DISPATCH.get((req.method, operation.lower()))
+        if handler is None:
             return func.HttpResponse(
                 json.dumps({"error": f"Unsupported operation: {operation}"}),
                 status_code=400,
                 mimetype="application/json"
             )
+        
+        return handler(req, menu_collection)
     
     except Exception as e:
         logging.error(f"Error processing menu operation: {str(e)}")
@@ -167,15 +346,16 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 def create_menu(req: func.HttpRequest, collection) -> func.HttpResponse:
     """Create a new menu"""
     try:
-        # Get request body
-        req_body = req.get_json()
+        # Get request body (a menu must be a JSON object)
+        req_body = _load_body(req)
+        if not isinstance(req_body, dict):
+            return _err("bad_body")
         
         # Validate required fields
-        required_fields = ["name", "restaurant_id"]
-        if not all(field in req_body for field in required_fields):
-            missing_fields = [field for field in required_fields if field not in req_body]
+        missing_fields = _REQUIRED_CREATE_FIELDS - req_body.keys()
+        if missing_fields:
             return func.HttpResponse(
-                json.dumps({"error": f"Missing required fields: {', '.join(missing_fields)}"}),
+                json.dumps({"error": f"Missing required fields: {', '.join(sorted(missing_fields))}"}),
                 status_code=400,
                 mimetype="application/json"
             )
@@ -195,23 +375,17 @@ def create_menu(req: func.HttpRequest, collection) -> func.HttpResponse:
             req_body["items"] = []
         
         # Create the menu
-        result = collection.insert_one(req_body)
-        
-        # Get created menu with _id
-        created_menu = collection.find_one({"_id": result.inserted_id})
+        # insert_one sets _id on req_body, so it is returned without re-reading
+        collection.insert_one(req_body)
         
         return func.HttpResponse(
-            json.dumps({"message": "Menu created successfully", "menu": created_menu}, cls=JSONEncoder),
+            _dumps({"message": "Menu created successfully", "menu": req_body}),
             status_code=201,
             mimetype="application/json"
         )
     
     except ValueError:
-        return func.HttpResponse(
-            json.dumps({"error": "Invalid request body. Please provide valid JSON."}),
-            status_code=400,
-            mimetype="application/json"
-        )
+        return _err("bad_body")
     except Exception as e:
         logging.error(f"Error creating menu: {str(e)}")
         return func.HttpResponse(
@@ -230,55 +404,84 @@ def get_menu(req: func.HttpRequest, collection) -> func.HttpResponse:
         
         if menu_id:
             # Get menu by ID
-            try:
-                menu = collection.find_one({"_id": ObjectId(menu_id)})
-            except:
-                return func.HttpResponse(
-                    json.dumps({"error": "Invalid menu ID format"}),
-                    status_code=400,
-                    mimetype="application/json"
-                )
+            if not ObjectId.is_valid(menu_id):
+                return _err("bad_menu_id")
+            
+            menu = collection.find_one({"_id": ObjectId(menu_id)})
             
             if not menu:
-                return func.HttpResponse(
-                    json.dumps({"error": "Menu not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
+                return _err("menu_not_found")
             
             return func.HttpResponse(
-                json.dumps({"menu": menu}, cls=JSONEncoder),
+                _dumps({"menu": menu}),
                 status_code=200,
                 mimetype="application/json"
             )
         
         elif restaurant_id:
             # Get all menus for a restaurant
-            menus = list(collection.find({"restaurant_id": restaurant_id, "is_active": True}))
+            cursor = collection.find({"restaurant_id": restaurant_id, "is_active": True}, _list_projection(req))
+            if _MENU_INDEXES_READY:
+                cursor = cursor.hint("restaurant_active")
+            
+            return func.HttpResponse(
+                _dumps_menus(cursor.batch_size(50)),
+                status_code=200,
+                mimetype="application/json"
+            )
+        
+        elif req.params.get('after'):
+            # Get the next page of menus after a given ID (keyset pagination, no skip)
+            after = req.params.get('after')
+            limit = int(req.params.get('limit', 10))
+            
+            if not ObjectId.is_valid(after):
+                return _err("bad_menu_id")
+            
+            cursor = collection.find(
+                {"is_active": True, "_id": {"$lt": ObjectId(after)}},
+                _list_projection(req)
+            ).sort("_id", -1).limit(limit)
+            if _MENU_INDEXES_READY:
+                cursor = cursor.hint("active_id")
             
             return func.HttpResponse(
-                json.dumps({"menus": menus, "count": len(menus)}, cls=JSONEncoder),
+                _dumps_menus(
+                    cursor.batch_size(50),
+                    next_after=lambda count, last_id: last_id if count == limit else None
+                ),
                 status_code=200,
                 mimetype="application/json"
             )
         
         else:
-            # Get all menus (with optional pagination)
+            # Get all menus (with optional pagination), newest first
             page = int(req.params.get('page', 1))
             limit = int(req.params.get('limit', 10))
             skip = (page - 1) * limit
             
-            menus = list(collection.find({"is_active": True}).skip(skip).limit(limit))
-            total_count = collection.count_documents({"is_active": True})
+            # Fetch the page and the total count in a single round-trip (sorting before $facet,
+            # where the active_id index can serve it)
+            result = next(collection.aggregate([
+                {"$match": {"is_active": True}},
+                {"$sort": {"_id": -1}},
+                {"$facet": {
+                    "data": [{"$skip": skip}, {"$limit": limit}, {"$project": _list_projection(req)}],
+                    "total": [{"$count": "n"}]
+                }}
+            ]), {})
+            menus = result.get("data", [])
+            total_count = result["total"][0]["n"] if result.get("total") else 0
             
             return func.HttpResponse(
-                json.dumps({
+                _dumps({
                     "menus": menus,
                     "count": len(menus),
                     "total_count": total_count,
                     "page": page,
-                    "total_pages": (total_count + limit - 1) // limit
-                }, cls=JSONEncoder),
+                    "total_pages": (total_count + limit - 1) // limit,
+                    "next_after": menus[-1]["_id"] if len(menus) == limit else None
+                }),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -299,14 +502,17 @@ def update_menu(req: func.HttpRequest, collection) -> func.HttpResponse:
         menu_id = req.params.get('id')
         
         if not menu_id:
-            return func.HttpResponse(
-                json.dumps({"error": "Menu ID is required for update"}),
-                status_code=400,
-                mimetype="application/json"
-            )
+            return _err("no_update_id")
         
-        # Get request body
-        req_body = req.get_json()
+        # Validate and parse the menu ID once
+        if not ObjectId.is_valid(menu_id):
+            return _err("bad_menu_id")
+        oid = ObjectId(menu_id)
+        
+        # Get request body (updates must be a JSON object)
+        req_body = _load_body(req)
+        if not isinstance(req_body, dict):
+            return _err("bad_body")
         
         # Add updated timestamp and user info
         req_body["updated_at"] = datetime.utcnow().isoformat()
@@ -316,51 +522,24 @@ def update_menu(req: func.HttpRequest, collection) -> func.HttpResponse:
         if "_id" in req_body:
             del req_body["_id"]
         
-        try:
-            # Check if menu exists
-            existing_menu = collection.find_one({"_id": ObjectId(menu_id)})
-            if not existing_menu:
-                return func.HttpResponse(
-                    json.dumps({"error": "Menu not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Update the menu
-            result = collection.update_one(
-                {"_id": ObjectId(menu_id)},
-                {"$set": req_body}
-            )
-            
-            if result.modified_count > 0:
-                # Get updated menu
-                updated_menu = collection.find_one({"_id": ObjectId(menu_id)})
-                
-                return func.HttpResponse(
-                    json.dumps({"message": "Menu updated successfully", "menu": updated_menu}, cls=JSONEncoder),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "No changes made to menu"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-        
-        except:
-            return func.HttpResponse(
-                json.dumps({"error": "Invalid menu ID format"}),
-                status_code=400,
-                mimetype="application/json"
-            )
-    
-    except ValueError:
+        # Update the menu and get the updated document in one round-trip
+        updated_menu = collection.find_one_and_update(
+            {"_id": oid},
+            {"$set": req_body},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if not updated_menu:
+            return _err("menu_not_found")
+        
         return func.HttpResponse(
-            json.dumps({"error": "Invalid request body. Please provide valid JSON."}),
-            status_code=400,
+            _dumps({"message": "Menu updated successfully", "menu": updated_menu}),
+            status_code=200,
             mimetype="application/json"
         )
+    
+    except ValueError:
+        return _err("bad_body")
     except Exception as e:
         logging.error(f"Error updating menu: {str(e)}")
         return func.HttpResponse(
@@ -377,54 +556,45 @@ def delete_menu(req: func.HttpRequest, collection) -> func.HttpResponse:
         menu_id = req.params.get('id')
         
         if not menu_id:
-            return func.HttpResponse(
-                json.dumps({"error": "Menu ID is required for deletion"}),
-                status_code=400,
-                mimetype="application/json"
-            )
+            return _err("no_delete_id")
         
-        try:
-            # Check if menu exists
-            existing_menu = collection.find_one({"_id": ObjectId(menu_id)})
-            if not existing_menu:
-                return func.HttpResponse(
-                    json.dumps({"error": "Menu not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Soft delete (mark as inactive) with user info
-            result = collection.update_one(
-                {"_id": ObjectId(menu_id)},
-                {
-                    "$set": {
-                        "is_active": False,
-                        "updated_at": datetime.utcnow().isoformat(),
-                        "deleted_by": req.token_data.get("preferred_username", "unknown"),
-                        "deleted_at": datetime.utcnow().isoformat()
-                    }
+        # Validate and parse the menu ID once
+        if not ObjectId.is_valid(menu_id):
+            return _err("bad_menu_id")
+        oid = ObjectId(menu_id)
+        
+        # Soft delete (mark as inactive) with user info, returning the
+        # prior active flag so we know whether it was already deleted
+        current_time = datetime.utcnow().isoformat()
+        previous_menu = collection.find_one_and_update(
+            {"_id": oid},
+            {
+                "$set": {
+                    "is_active": False,
+                    "updated_at": current_time,
+                    "deleted_by": req.token_data.get("preferred_username", "unknown"),
+                    "deleted_at": current_time
                 }
+            },
+            projection={"is_active": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        # For hard delete, use: result = collection.delete_one({"_id": oid})
+        
+        if not previous_menu:
+            return _err("menu_not_found")
+        
+        if previous_menu.get("is_active", True):
+            return func.HttpResponse(
+                json.dumps({"message": "Menu deleted successfully"}),
+                status_code=200,
+                mimetype="application/json"
             )
-            
-            # For hard delete, use: result = collection.delete_one({"_id": ObjectId(menu_id)})
-            
-            if result.modified_count > 0:
-                return func.HttpResponse(
-                    json.dumps({"message": "Menu deleted successfully"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "Menu was already marked as deleted"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-        
-        except:
+        else:
             return func.HttpResponse(
-                json.dumps({"error": "Invalid menu ID format"}),
-                status_code=400,
+                json.dumps({"message": "Menu was already marked as deleted"}),
+                status_code=200,
                 mimetype="application/json"
             )
     
@@ -434,4 +604,12 @@ def delete_menu(req: func.HttpRequest, collection) -> func.HttpResponse:
             json.dumps({"error": f"Failed to delete menu: {str(e)}"}),
             status_code=500,
             mimetype="application/json"
-        )
\ No newline at end of file
+        )
+
+# Map (HTTP method, operation) to the handler for that CRUD operation
+_DISPATCH = {
+    ("POST", "create"): create_menu,
+    ("GET", "get"): get_menu,
+    ("PUT", "update"): update_menu,
+    ("DELETE", "delete"): delete_menu,
+}
@@ -4,518 +4,869 @@ These models define the structure for restaurant, menu, menu items, and staff da
 """
 
 from typing import List, Dict, Optional, Union
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from sys import intern
+from types import MappingProxyType
+import orjson
+from bson import ObjectId
+
+_utcnow = datetime.utcnow
+
+# Current time as the ISO string stored in timestamp fields
+def _now_iso() -> str:
+    return _utcnow().isoformat()
+
+# Shared default for list fields; methods that append replace it with a real list first
+_EMPTY = ()
+
+# Default missing creation/update timestamps to now, formatting the current time at most once.
+# Returns the formatted time when one was needed (None otherwise) so callers can reuse it.
+def _fill_timestamps(obj) -> Optional[str]:
+    if obj.created_at is None or obj.updated_at is None:
+        now = _now_iso()
+        if obj.created_at is None:
+            obj.created_at = now
+        if obj.updated_at is None:
+            obj.updated_at = now
+        return now
+    return None
+
+# Intern the model's enumerated string fields (status, order_type, ...)
+def _intern_fields(obj) -> None:
+    for name in obj._INTERNED_FIELDS:
+        value = getattr(obj, name)
+        if type(value) is str:
+            setattr(obj, name, intern(value))
+
+# Field names accepted from database dictionaries, per model class
+_FIELD_NAMES: Dict[type, frozenset] = {}
+
+def _field_names(cls) -> frozenset:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = frozenset(f.name for f in fields(cls)) - {'id'}
+    return names
+
+# Build a model from a database dictionary, keeping only known fields ('_id' maps to id)
+def _from_dict(cls, data: Dict, **derived):
+    names = _field_names(cls)
+    kwargs = {key: value for key, value in data.items() if key in names}
+    kwargs.update(derived)
+    return cls(id=data.get('_id'), **kwargs)
+
+# Build models from an iterable of database dictionaries (e.g. a cursor), looking up
+# the class's field names once for the whole batch
+def _many(cls, dicts) -> List:
+    names = _field_names(cls)
+    return [
+        cls(id=data.get('_id'), **{key: value for key, value in data.items() if key in names})
+        for data in dicts
+    ]
+
+# Build a model via from_dict, reusing the instance already built for the same document version.
+# The cache is owned by the caller (e.g. one per request), so shared instances never outlive it.
+def _memoized_from_dict(cls, data: Dict, cache: Optional[Dict]):
+    if cache is None or '_id' not in data or 'updated_at' not in data:
+        return cls.from_dict(data)
+    key = (cls, data['_id'], data['updated_at'])
+    model = cache.get(key)
+    if model is None:
+        model = cache[key] = cls.from_dict(data)
+    return model
+
+# Slot names declared along each model's class hierarchy (base fields first)
+_SLOT_NAMES: Dict[type, tuple] = {}
+
+def _slot_names(model_class) -> tuple:
+    names = _SLOT_NAMES.get(model_class)
+    if names is None:
+        names = _SLOT_NAMES[model_class] = tuple(dict.fromkeys(
+            name
+            for cls in reversed(model_class.__mro__)
+            for name in cls.__dict__.get('__slots__', ())
+        ))
+    return names
+
+# Build a fresh dictionary from the model's slots (never a live reference to the model's state)
+def _slots_to_dict(obj) -> Dict:
+    result = {}
+    for name in _slot_names(type(obj)):
+        value = getattr(obj, name)
+        result[name] = _thaw(value) if type(value) in _NESTED_TYPES else value
+    return result
+
+# Plain mutable form of a nested value: read-only templates and nested models become
+# dictionaries, dictionaries and lists are copied so the result never shares state with the model
+def _thaw(value):
+    value_type = type(value)
+    if value_type is MappingProxyType or value_type is dict:
+        return {key: _thaw(item) for key, item in value.items()}
+    if value_type is list:
+        return [_thaw(item) for item in value]
+    if value_type in _NESTED_MODELS:
+        # Keys kept from the stored dictionary go back alongside the declared fields
+        result = _slots_to_dict(value)
+        extra = result.pop('extra')
+        if extra:
+            result.update(extra)
+        return result
+    return value
+
+# Mutable copy of a read-only default template, leaving everything else as is
+def _copy_template(value):
+    if type(value) is MappingProxyType:
+        return {key: _copy_template(item) for key, item in value.items()}
+    return value
+
+# Pickle state as the flat tuple of slot values, in _slot_names order
+# (read-only default templates cannot be pickled, so they are stored as plain dictionaries)
+def _getstate(obj) -> tuple:
+    return tuple(_copy_template(getattr(obj, name)) for name in _slot_names(type(obj)))
+
+def _setstate(obj, state: tuple) -> None:
+    for name, value in zip(_slot_names(type(obj)), state):
+        object.__setattr__(obj, name, value)
+
+def json_default(obj):
+    """orjson default hook; models are encoded through their dictionaries so nested extra keys stay flat"""
+    if type(obj) is MappingProxyType:
+        return _thaw(obj)
+    if type(obj) is ObjectId:
+        return str(obj)
+    if type(obj) in _NESTED_MODELS:
+        return _thaw(obj)
+    if hasattr(type(obj), '__dataclass_fields__'):
+        return _slots_to_dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def models_to_json(obj) -> bytes:
+    """Encode a model (or a list of models) as JSON bytes, directly from its slots"""
+    return orjson.dumps(obj, default=json_default, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+
+# Small fixed-shape nested objects, stored as frozen value objects instead of dictionaries
+@dataclass(slots=True, frozen=True)
+class Coordinates:
+    latitude: float = 0.0
+    longitude: float = 0.0
+    extra: Optional[Dict] = field(default=None, compare=False)  # Stored keys not declared above
+
+@dataclass(slots=True, frozen=True)
+class DayHours:
+    open: str = ''
+    close: str = ''
+    extra: Optional[Dict] = field(default=None, compare=False)  # Stored keys not declared above
+
+@dataclass(slots=True, frozen=True)
+class SubRatings:
+    food: int = 0
+    service: int = 0
+    ambiance: int = 0
+    value: int = 0
+    cleanliness: int = 0
+    extra: Optional[Dict] = field(default=None, compare=False)  # Stored keys not declared above
+
+@dataclass(slots=True, frozen=True)
+class ReviewResponse:
+    text: str = ''
+    author_id: str = ''  # Staff member who responded
+    author_title: str = ''  # e.g., "Manager", "Owner"
+    date: str = ''
+    is_edited: bool = False
+    extra: Optional[Dict] = field(default=None, compare=False)  # Stored keys not declared above
+
+# A single line of an order (mutable, unlike the value objects above)
+@dataclass(slots=True)
+class OrderLineItem:
+    item_id: str = ''  # Menu item id
+    name: str = ''
+    quantity: int = 1
+    unit_price: float = 0.0
+    subtotal: float = 0.0
+    special_instructions: str = ''
+    customizations: List = _EMPTY  # e.g. [{"name": "Extra cheese", "price": 1.50}]
+    status: str = ''  # Optional item-level status
+    extra: Optional[Dict] = field(default=None, compare=False)  # Stored keys not declared above
+
+_NESTED_MODELS = frozenset((Coordinates, DayHours, SubRatings, ReviewResponse, OrderLineItem))
+_NESTED_TYPES = _NESTED_MODELS | {MappingProxyType, dict, list}
+
+# Value object for a stored dictionary (unknown keys are kept in its extra mapping); anything else is returned as is
+def _value_object(cls, value):
+    if type(value) is not dict:
+        return value
+    names = _slot_names(cls)
+    known = {key: item for key, item in value.items() if key in names and key != 'extra'}
+    if len(known) == len(value):
+        return cls(**known)
+    return cls(**known, extra={key: item for key, item in value.items() if key not in known})
+
+# Hours for a day with nothing set (value objects are immutable, so every day can share it)
+_NO_HOURS = DayHours()
 
 # Base model for our core objects
+@dataclass(slots=True)
 class BaseModel:
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('_id')
-        self.created_at = kwargs.get('created_at', datetime.utcnow().isoformat())
-        self.updated_at = kwargs.get('updated_at', datetime.utcnow().isoformat())
-        self.is_active = kwargs.get('is_active', True)
+    # String fields drawn from small fixed vocabularies; interned so equal values share one object
+    _INTERNED_FIELDS = ()
+    
+    id: Optional[str] = None  # Database _id
+    created_at: Optional[str] = None  # Defaults to now
+    updated_at: Optional[str] = None  # Defaults to now
+    is_active: bool = True
+    
+    def __post_init__(self):
+        _fill_timestamps(self)
+        _intern_fields(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Build a model from a database dictionary, ignoring unknown keys"""
+        return _from_dict(cls, data)
+    
+    @classmethod
+    def many(cls, dicts) -> List:
+        """Build models from an iterable of database dictionaries"""
+        return _many(cls, dicts)
     
     def to_dict(self) -> Dict:
         """Convert model to dictionary for database storage"""
-        return self.__dict__
+        return _slots_to_dict(self)
+    
+    __getstate__ = _getstate
+    __setstate__ = _setstate
 
 # MenuItem represents a single dish or product on a menu
+@dataclass(slots=True)
 class MenuItem(BaseModel):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.name = kwargs.get('name', '')
-        self.description = kwargs.get('description', '')
-        self.price = kwargs.get('price', 0.0)
-        self.category = kwargs.get('category', '')
-        self.image_url = kwargs.get('image_url', '')
-        self.prep_video_url = kwargs.get('prep_video_url', '')  # URL to preparation video
-        self.ingredients = kwargs.get('ingredients', [])
-        self.allergens = kwargs.get('allergens', [])
-        self.nutritional_info = kwargs.get('nutritional_info', {})
-        self.tags = kwargs.get('tags', [])  # For filtering (vegan, spicy, etc.)
-        self.available = kwargs.get('available', True)
-        self.featured = kwargs.get('featured', False)
-        self.special_instructions = kwargs.get('special_instructions', '')
-        self.preparation_time = kwargs.get('preparation_time', 0)  # in minutes
-        self.popularity_score = kwargs.get('popularity_score', 0)  # for sorting
+    name: str = ''
+    description: str = ''
+    price: float = 0.0
+    category: str = ''
+    image_url: str = ''
+    prep_video_url: str = ''  # URL to preparation video
+    ingredients: List = _EMPTY
+    allergens: List = _EMPTY
+    nutritional_info: Dict = field(default_factory=dict)
+    tags: List = _EMPTY  # For filtering (vegan, spicy, etc.)
+    available: bool = True
+    featured: bool = False
+    special_instructions: str = ''
+    preparation_time: int = 0  # in minutes
+    popularity_score: int = 0  # for sorting
 
 # Menu represents a collection of menu items
+@dataclass(slots=True)
 class Menu(BaseModel):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.restaurant_id = kwargs.get('restaurant_id', '')  # Reference to restaurant
-        self.name = kwargs.get('name', '')
-        self.description = kwargs.get('description', '')
-        self.type = kwargs.get('type', 'regular')  # regular, special, seasonal, brunch, etc.
-        self.categories = kwargs.get('categories', [])  # List of category names
-        self.hours = kwargs.get('hours', {})  # When this menu is available
-        self.image_url = kwargs.get('image_url', '')
-        self.items = kwargs.get('items', [])  # Can be list of item IDs or embedded items
-        self.is_default = kwargs.get('is_default', False)  # Is this the default menu?
-        self.language = kwargs.get('language', 'en')  # Support multiple languages
-        self.sort_order = kwargs.get('sort_order', {})  # How to sort categories and items
+    _INTERNED_FIELDS = ('language',)
+    
+    restaurant_id: str = ''  # Reference to restaurant
+    name: str = ''
+    description: str = ''
+    type: str = 'regular'  # regular, special, seasonal, brunch, etc.
+    categories: List = _EMPTY  # List of category names
+    hours: Dict = field(default_factory=dict)  # When this menu is available
+    image_url: str = ''
+    items: List = _EMPTY  # Can be list of item IDs or embedded items
+    is_default: bool = False  # Is this the default menu?
+    language: str = 'en'  # Support multiple languages
+    sort_order: Dict = field(default_factory=dict)  # How to sort categories and items
 
 # Staff represents restaurant employees that can be featured on the menu/website
+@dataclass(slots=True)
 class Staff(BaseModel):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.restaurant_id = kwargs.get('restaurant_id', '')
-        self.name = kwargs.get('name', '')
-        self.position = kwargs.get('position', '')  # Chef, Manager, Bartender, etc.
-        self.bio = kwargs.get('bio', '')
-        self.profile_image = kwargs.get('profile_image', '')
-        self.intro_video_url = kwargs.get('intro_video_url', '')
-        self.videos = kwargs.get('videos', [])  # List of video URLs
-        self.photos = kwargs.get('photos', [])  # List of photo URLs
-        self.menu_items = kwargs.get('menu_items', [])  # List of menu item IDs this staff is associated with
-        self.specialties = kwargs.get('specialties', [])
-        self.social_media = kwargs.get('social_media', {})
-        self.awards = kwargs.get('awards', [])
-        self.featured = kwargs.get('featured', False)
+    restaurant_id: str = ''
+    name: str = ''
+    position: str = ''  # Chef, Manager, Bartender, etc.
+    bio: str = ''
+    profile_image: str = ''
+    intro_video_url: str = ''
+    videos: List = _EMPTY  # List of video URLs
+    photos: List = _EMPTY  # List of photo URLs
+    menu_items: List = _EMPTY  # List of menu item IDs this staff is associated with
+    specialties: List = _EMPTY
+    social_media: Dict = field(default_factory=dict)
+    awards: List = _EMPTY
+    featured: bool = False
+
+# Shared read-only defaults for a restaurant's nested objects (copy with dict() before changing one)
+_DEFAULT_LOCATION = MappingProxyType({
+    'address': '',
+    'city': '',
+    'state': '',
+    'country': '',
+    'postal_code': '',
+    'coordinates': Coordinates()
+})
+_DEFAULT_CONTACT = MappingProxyType({
+    'phone': '',
+    'email': '',
+    'website': ''
+})
+_DEFAULT_HOURS = MappingProxyType({
+    'monday': _NO_HOURS,
+    'tuesday': _NO_HOURS,
+    'wednesday': _NO_HOURS,
+    'thursday': _NO_HOURS,
+    'friday': _NO_HOURS,
+    'saturday': _NO_HOURS,
+    'sunday': _NO_HOURS
+})
 
 # Restaurant represents the main business entity
+@dataclass(slots=True)
 class Restaurant(BaseModel):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.name = kwargs.get('name', '')
-        self.description = kwargs.get('description', '')
-        self.location = kwargs.get('location', {
-            'address': '',
-            'city': '',
-            'state': '',
-            'country': '',
-            'postal_code': '',
-            'coordinates': {
-                'latitude': 0.0,
-                'longitude': 0.0
-            }
-        })
-        self.contact = kwargs.get('contact', {
-            'phone': '',
-            'email': '',
-            'website': ''
-        })
-        self.hours = kwargs.get('hours', {
-            'monday': {'open': '', 'close': ''},
-            'tuesday': {'open': '', 'close': ''},
-            'wednesday': {'open': '', 'close': ''},
-            'thursday': {'open': '', 'close': ''},
-            'friday': {'open': '', 'close': ''},
-            'saturday': {'open': '', 'close': ''},
-            'sunday': {'open': '', 'close': ''}
-        })
-        self.owner_id = kwargs.get('owner_id', '')  # Reference to user who owns this restaurant
-        self.logo_url = kwargs.get('logo_url', '')
-        self.cover_image_url = kwargs.get('cover_image_url', '')
-        self.photos = kwargs.get('photos', [])
-        self.cuisine_types = kwargs.get('cuisine_types', [])
-        self.price_range = kwargs.get('price_range', '')  # $, $$, $$$, $$$$
-        self.features = kwargs.get('features', [])  # Outdoor seating, Delivery, etc.
-        self.social_media = kwargs.get('social_media', {})
-        self.menus = kwargs.get('menus', [])  # References to menu IDs
-        self.staff = kwargs.get('staff', [])  # References to staff IDs
-        self.avg_rating = kwargs.get('avg_rating', 0.0)
-        self.review_count = kwargs.get('review_count', 0)
-        self.qr_codes = kwargs.get('qr_codes', [])  # QR codes generated for this restaurant
+    _INTERNED_FIELDS = ('price_range',)
+    
+    name: str = ''
+    description: str = ''
+    location: Dict = field(default_factory=lambda: _DEFAULT_LOCATION)
+    contact: Dict = field(default_factory=lambda: _DEFAULT_CONTACT)
+    hours: Dict = field(default_factory=lambda: _DEFAULT_HOURS)
+    owner_id: str = ''  # Reference to user who owns this restaurant
+    logo_url: str = ''
+    cover_image_url: str = ''
+    photos: List = _EMPTY
+    cuisine_types: List = _EMPTY
+    price_range: str = ''  # $, $$, $$$, $$$$
+    features: List = _EMPTY  # Outdoor seating, Delivery, etc.
+    social_media: Dict = field(default_factory=dict)
+    menus: List = _EMPTY  # References to menu IDs
+    staff: List = _EMPTY  # References to staff IDs
+    avg_rating: float = 0.0
+    review_count: int = 0
+    qr_codes: List = _EMPTY  # QR codes generated for this restaurant
+    
+    def __post_init__(self):
+        BaseModel.__post_init__(self)
+        # Stored dictionaries become value objects (copying, so the caller's data is untouched)
+        coordinates = self.location.get('coordinates')
+        if type(coordinates) is dict:
+            self.location = {**self.location, 'coordinates': _value_object(Coordinates, coordinates)}
+        if any(type(day) is dict for day in self.hours.values()):
+            self.hours = {name: _value_object(DayHours, day) for name, day in self.hours.items()}
 
 # Define dictionary to model conversion helper function
-def dict_to_model(data: Dict, model_class):
+def dict_to_model(data: Dict, model_class, cache: Optional[Dict] = None):
     """Convert database dictionary to model object"""
     if not data:
         return None
-    return model_class(**data)
+    return _memoized_from_dict(model_class, data, cache)
 
+# Shared read-only defaults for a customer's nested objects (copy with dict() before changing one)
+_DEFAULT_ADDRESS = MappingProxyType({
+    'street': '',
+    'city': '',
+    'state': '',
+    'country': '',
+    'postal_code': ''
+})
+_DEFAULT_MARKETING_PREFERENCES = MappingProxyType({
+    'email': False,
+    'sms': False,
+    'push': False
+})
+
+@dataclass(slots=True)
 class Customer:
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('_id')
-        self.created_at = kwargs.get('created_at', datetime.utcnow().isoformat())
-        self.updated_at = kwargs.get('updated_at', datetime.utcnow().isoformat())
-        self.is_active = kwargs.get('is_active', True)
-        
-        # Basic Information
-        self.fullname = kwargs.get('fullname', '')
-        self.email = kwargs.get('email', '')
-        self.phone_number = kwargs.get('phone_number', '')
-        self.profile_image = kwargs.get('profile_image', '')
-        
-        # Authentication related fields
-        self.entra_id = kwargs.get('entra_id')
-        self.user_principal_name = kwargs.get('user_principal_name')
-        self.password = kwargs.get('password')  # Hashed password
-        
-        # Address
-        self.address = kwargs.get('address', {
-            'street': '',
-            'city': '',
-            'state': '',
-            'country': '',
-            'postal_code': ''
-        })
-        
-        # Preferences
-        self.dietary_preferences = kwargs.get('dietary_preferences', [])  # Vegan, Vegetarian, Gluten-free, etc.
-        self.allergens = kwargs.get('allergens', [])  # Nuts, Shellfish, Dairy, etc.
-        self.favorite_restaurants = kwargs.get('favorite_restaurants', [])  # List of restaurant IDs
-        self.favorite_dishes = kwargs.get('favorite_dishes', [])  # List of menu item IDs
-        self.cuisine_preferences = kwargs.get('cuisine_preferences', [])  # Italian, Mexican, Chinese, etc.
-        
-        # Order History
-        self.order_history = kwargs.get('order_history', [])  # List of order IDs
-        self.reservations = kwargs.get('reservations', [])  # List of reservation IDs
-        
-        # Loyalty & Marketing
-        self.loyalty_points = kwargs.get('loyalty_points', 0)
-        self.loyalty_tier = kwargs.get('loyalty_tier', 'Standard')  # Standard, Silver, Gold, etc.
-        self.marketing_preferences = kwargs.get('marketing_preferences', {
-            'email': False,
-            'sms': False,
-            'push': False
-        })
-        self.referral_code = kwargs.get('referral_code', '')
-        self.referrer_id = kwargs.get('referrer_id', '')  # Customer ID who referred this customer
-        
-        # Analytics & Personalization
-        self.last_login = kwargs.get('last_login', '')
-        self.visit_count = kwargs.get('visit_count', 0)
-        self.average_order_value = kwargs.get('average_order_value', 0.0)
-        self.lifetime_value = kwargs.get('lifetime_value', 0.0)
-        self.ratings = kwargs.get('ratings', [])  # List of restaurant/item ratings
-        
-        # Payment Information (references to securely stored payment methods)
-        self.payment_methods = kwargs.get('payment_methods', [])  # List of payment method IDs
-        
-        # Notes and Custom Fields
-        self.notes = kwargs.get('notes', '')
-        self.custom_fields = kwargs.get('custom_fields', {})
-        self.tags = kwargs.get('tags', [])
+    _INTERNED_FIELDS = ('loyalty_tier',)
+    
+    id: Optional[str] = None  # Database _id
+    created_at: Optional[str] = None  # Defaults to now
+    updated_at: Optional[str] = None  # Defaults to now
+    is_active: bool = True
+    
+    # Basic Information
+    fullname: str = ''
+    email: str = ''
+    phone_number: str = ''
+    profile_image: str = ''
+    
+    # Authentication related fields
+    entra_id: Optional[str] = None
+    user_principal_name: Optional[str] = None
+    password: Optional[str] = None  # Hashed password
+    
+    # Address
+    address: Dict = field(default_factory=lambda: _DEFAULT_ADDRESS)
+    
+    # Preferences
+    dietary_preferences: List = _EMPTY  # Vegan, Vegetarian, Gluten-free, etc.
+    allergens: List = _EMPTY  # Nuts, Shellfish, Dairy, etc.
+    favorite_restaurants: List = _EMPTY  # List of restaurant IDs
+    favorite_dishes: List = _EMPTY  # List of menu item IDs
+    cuisine_preferences: List = _EMPTY  # Italian, Mexican, Chinese, etc.
+    
+    # Order History
+    order_history: List = _EMPTY  # List of order IDs
+    reservations: List = _EMPTY  # List of reservation IDs
+    
+    # Loyalty & Marketing
+    loyalty_points: int = 0
+    loyalty_tier: str = 'Standard'  # Standard, Silver, Gold, etc.
+    marketing_preferences: Dict = field(default_factory=lambda: _DEFAULT_MARKETING_PREFERENCES)
+    referral_code: str = ''
+    referrer_id: str = ''  # Customer ID who referred this customer
+    
+    # Analytics & Personalization
+    last_login: str = ''
+    visit_count: int = 0
+    average_order_value: float = 0.0
+    lifetime_value: float = 0.0
+    ratings: List = _EMPTY  # List of restaurant/item ratings
+    
+    # Payment Information (references to securely stored payment methods)
+    payment_methods: List = _EMPTY  # List of payment method IDs
+    
+    # Notes and Custom Fields
+    notes: str = ''
+    custom_fields: Dict = field(default_factory=dict)
+    tags: List = _EMPTY
 
+    def __post_init__(self):
+        _fill_timestamps(self)
+        _intern_fields(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Build a model from a database dictionary, ignoring unknown keys"""
+        return _from_dict(cls, data)
+    
+    @classmethod
+    def many(cls, dicts) -> List:
+        """Build models from an iterable of database dictionaries"""
+        return _many(cls, dicts)
+    
     def to_dict(self) -> Dict:
         """Convert model to dictionary for database storage"""
-        return self.__dict__
+        return _slots_to_dict(self)
+    
+    __getstate__ = _getstate
+    __setstate__ = _setstate
 
-def dict_to_customer(data: Dict) -> Optional[Customer]:
+def dict_to_customer(data: Dict, cache: Optional[Dict] = None) -> Optional[Customer]:
     """Convert dictionary to Customer object"""
     if not data:
         return None
-    return Customer(**data)
+    return _memoized_from_dict(Customer, data, cache)
+
+# Shared read-only default for an order's delivery address (copy with dict() before changing it)
+_DEFAULT_DELIVERY_ADDRESS = MappingProxyType({
+    'street': '',
+    'city': '',
+    'state': '',
+    'country': '',
+    'postal_code': '',
+    'instructions': ''
+})
+
+# Lifecycle timestamp fields set when an order enters each status
+_STATUS_TIMESTAMP_ATTRS = {
+    'confirmed': ('confirmed_at',),
+    'preparing': ('preparing_at',),
+    'ready': ('ready_at', 'actual_ready_time'),
+    'delivered': ('delivered_at',),
+    'completed': ('completed_at',),
+    'cancelled': ('cancelled_at',)
+}
 
+@dataclass(slots=True)
 class Order:
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('_id')
-        self.created_at = kwargs.get('created_at', datetime.utcnow().isoformat())
-        self.updated_at = kwargs.get('updated_at', datetime.utcnow().isoformat())
-        self.is_active = kwargs.get('is_active', True)
-        
-        # Basic Order Information
-        self.order_number = kwargs.get('order_number', '')  # Unique order number (could be auto-generated)
-        self.restaurant_id = kwargs.get('restaurant_id', '')  # Reference to restaurant
-        self.customer_id = kwargs.get('customer_id', '')  # Reference to customer (can be null for guest orders)
-        self.table_number = kwargs.get('table_number', '')  # Physical table or 'Takeout'/'Delivery'
-        
-        # Order Type and Status
-        self.order_type = kwargs.get('order_type', 'dine-in')  # dine-in, takeout, delivery, catering
-        self.status = kwargs.get('status', 'pending')  # pending, confirmed, preparing, ready, delivered, completed, cancelled
-        
-        # Order Items
-        self.items = kwargs.get('items', [])  # List of ordered items with customizations
-        # Each item structure:
-        # {
-        #    "item_id": "menu_item_id",
-        #    "name": "Item Name",
-        #    "quantity": 2,
-        #    "unit_price": 12.99,
-        #    "subtotal": 25.98,
-        #    "special_instructions": "No onions",
-        #    "customizations": [
-        #      {"name": "Extra cheese", "price": 1.50}
-        #    ],
-        #    "status": "preparing" (optional item-level status)
-        # }
-        
-        # Financial Information
-        self.subtotal = kwargs.get('subtotal', 0.0)  # Sum of all items before tax/tip
-        self.tax = kwargs.get('tax', 0.0)
-        self.tax_rate = kwargs.get('tax_rate', 0.0)  # As a decimal (e.g., 0.08 for 8%)
-        self.tip = kwargs.get('tip', 0.0)
-        self.tip_percentage = kwargs.get('tip_percentage', 0.0)  # As a decimal
-        self.discount = kwargs.get('discount', 0.0)
-        self.discount_code = kwargs.get('discount_code', '')
-        self.service_fee = kwargs.get('service_fee', 0.0)
-        self.delivery_fee = kwargs.get('delivery_fee', 0.0)
-        self.total = kwargs.get('total', 0.0)  # Final amount
-        
-        # Payment Information
-        self.payment_status = kwargs.get('payment_status', 'unpaid')  # unpaid, paid, refunded, partially_refunded
-        self.payment_method = kwargs.get('payment_method', '')  # credit_card, cash, mobile_payment, etc.
-        self.payment_id = kwargs.get('payment_id', '')  # Reference to payment transaction
-        self.payment_time = kwargs.get('payment_time', '')  # When payment was processed
-        
-        # Delivery Information (if applicable)
-        self.delivery_address = kwargs.get('delivery_address', {
-            'street': '',
-            'city': '',
-            'state': '',
-            'country': '',
-            'postal_code': '',
-            'instructions': ''
-        })
-        self.delivery_time = kwargs.get('delivery_time', '')  # Requested or estimated delivery time
-        self.delivery_person_id = kwargs.get('delivery_person_id', '')  # Reference to delivery person
-        
-        # Timestamps for Order Lifecycle
-        self.confirmed_at = kwargs.get('confirmed_at', '')
-        self.preparing_at = kwargs.get('preparing_at', '')
-        self.ready_at = kwargs.get('ready_at', '')
-        self.delivered_at = kwargs.get('delivered_at', '')
-        self.completed_at = kwargs.get('completed_at', '')
-        self.cancelled_at = kwargs.get('cancelled_at', '')
-        self.estimated_ready_time = kwargs.get('estimated_ready_time', '')
-        self.actual_ready_time = kwargs.get('actual_ready_time', '')
-        
-        # Customer Feedback
-        self.rating = kwargs.get('rating', 0)  # 1-5 star rating
-        self.review = kwargs.get('review', '')
-        self.reviewed_at = kwargs.get('reviewed_at', '')
-        
-        # Staff Information
-        self.server_id = kwargs.get('server_id', '')  # Server/waiter who handled the order
-        self.chef_id = kwargs.get('chef_id', '')  # Chef who prepared the order
-        
-        # Additional Information
-        self.special_instructions = kwargs.get('special_instructions', '')  # Overall order instructions
-        self.allergies = kwargs.get('allergies', [])  # List of allergies to be aware of
-        self.occasion = kwargs.get('occasion', '')  # Birthday, anniversary, etc.
-        self.loyalty_points_earned = kwargs.get('loyalty_points_earned', 0)
-        self.source = kwargs.get('source', 'in-person')  # in-person, website, app, phone, third-party
-        
-        # For third-party orders (if applicable)
-        self.third_party_id = kwargs.get('third_party_id', '')  # Order ID in third-party system
-        self.third_party_name = kwargs.get('third_party_name', '')  # e.g., UberEats, DoorDash
-        self.third_party_fee = kwargs.get('third_party_fee', 0.0)
-        
-        # Administrative
-        self.notes = kwargs.get('notes', '')  # Internal notes
-        self.refund_status = kwargs.get('refund_status', '')  # none, partial, full
-        self.refund_amount = kwargs.get('refund_amount', 0.0)
-        self.refund_reason = kwargs.get('refund_reason', '')
-        self.tags = kwargs.get('tags', [])  # For categorization/filtering
+    _INTERNED_FIELDS = ('order_type', 'status', 'payment_status', 'payment_method', 'source', 'refund_status')
+    
+    id: Optional[str] = None  # Database _id
+    created_at: Optional[str] = None  # Defaults to now
+    updated_at: Optional[str] = None  # Defaults to now
+    is_active: bool = True
+    
+    # Basic Order Information
+    order_number: str = ''  # Unique order number (could be auto-generated)
+    restaurant_id: str = ''  # Reference to restaurant
+    customer_id: str = ''  # Reference to customer (can be null for guest orders)
+    table_number: str = ''  # Physical table or 'Takeout'/'Delivery'
+    
+    # Order Type and Status
+    order_type: str = 'dine-in'  # dine-in, takeout, delivery, catering
+    status: str = 'pending'  # pending, confirmed, preparing, ready, delivered, completed, cancelled
+    
+    # Order Items
+    items: List = _EMPTY  # List of OrderLineItem; stored item dictionaries are converted on construction
+    
+    # Financial Information
+    subtotal: float = 0.0  # Sum of all items before tax/tip
+    tax: float = 0.0
+    tax_rate: float = 0.0  # As a decimal (e.g., 0.08 for 8%)
+    tip: float = 0.0
+    tip_percentage: float = 0.0  # As a decimal
+    discount: float = 0.0
+    discount_code: str = ''
+    service_fee: float = 0.0
+    delivery_fee: float = 0.0
+    total: float = 0.0  # Final amount
+    
+    # Payment Information
+    payment_status: str = 'unpaid'  # unpaid, paid, refunded, partially_refunded
+    payment_method: str = ''  # credit_card, cash, mobile_payment, etc.
+    payment_id: str = ''  # Reference to payment transaction
+    payment_time: str = ''  # When payment was processed
+    
+    # Delivery Information (if applicable)
+    delivery_address: Dict = field(default_factory=lambda: _DEFAULT_DELIVERY_ADDRESS)
+    delivery_time: str = ''  # Requested or estimated delivery time
+    delivery_person_id: str = ''  # Reference to delivery person
+    
+    # Timestamps for Order Lifecycle
+    confirmed_at: str = ''
+    preparing_at: str = ''
+    ready_at: str = ''
+    delivered_at: str = ''
+    completed_at: str = ''
+    cancelled_at: str = ''
+    estimated_ready_time: str = ''
+    actual_ready_time: str = ''
+    
+    # Customer Feedback
+    rating: int = 0  # 1-5 star rating
+    review: str = ''
+    reviewed_at: str = ''
+    
+    # Staff Information
+    server_id: str = ''  # Server/waiter who handled the order
+    chef_id: str = ''  # Chef who prepared the order
+    
+    # Additional Information
+    special_instructions: str = ''  # Overall order instructions
+    allergies: List = _EMPTY  # List of allergies to be aware of
+    occasion: str = ''  # Birthday, anniversary, etc.
+    loyalty_points_earned: int = 0
+    source: str = 'in-person'  # in-person, website, app, phone, third-party
+    
+    # For third-party orders (if applicable)
+    third_party_id: str = ''  # Order ID in third-party system
+    third_party_name: str = ''  # e.g., UberEats, DoorDash
+    third_party_fee: float = 0.0
+    
+    # Administrative
+    notes: str = ''  # Internal notes
+    refund_status: str = ''  # none, partial, full
+    refund_amount: float = 0.0
+    refund_reason: str = ''
+    tags: List = _EMPTY  # For categorization/filtering
 
+    def __post_init__(self):
+        _fill_timestamps(self)
+        _intern_fields(self)
+        if any(type(item) is dict for item in self.items):
+            self.items = [_value_object(OrderLineItem, item) for item in self.items]
+    
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Build a model from a database dictionary, ignoring unknown keys"""
+        return _from_dict(cls, data)
+    
+    @classmethod
+    def many(cls, dicts) -> List:
+        """Build models from an iterable of database dictionaries"""
+        return _many(cls, dicts)
+    
     def to_dict(self) -> Dict:
         """Convert model to dictionary for database storage"""
-        return self.__dict__
+        return _slots_to_dict(self)
+    
+    __getstate__ = _getstate
+    __setstate__ = _setstate
 
     def calculate_total(self):
         """Calculate the total amount for the order"""
-        self.subtotal = sum(item.get('subtotal', 0) for item in self.items)
-        self.tax = round(self.subtotal * self.tax_rate, 2)
+        subtotal = 0.0
+        for item in self.items:
+            subtotal += item.subtotal
+        return self._apply_subtotal(subtotal)
+
+    def _apply_subtotal(self, subtotal):
+        # Derive tax, tip and total from the items subtotal
+        tax = round(subtotal * self.tax_rate, 2)
         
         # Calculate tip if provided as percentage
-        if self.tip_percentage > 0 and self.tip == 0:
-            self.tip = round(self.subtotal * self.tip_percentage, 2)
-            
-        self.total = self.subtotal + self.tax + self.tip + self.service_fee + self.delivery_fee - self.discount
-        return self.total
+        tip = self.tip
+        if self.tip_percentage > 0 and tip == 0:
+            tip = round(subtotal * self.tip_percentage, 2)
+        
+        total = subtotal + tax + tip + self.service_fee + self.delivery_fee - self.discount
+        self.subtotal, self.tax, self.tip, self.total = subtotal, tax, tip, total
+        return total
 
     def add_item(self, item_data):
-        """Add an item to the order"""
+        """Add an item (an OrderLineItem or its dictionary) to the order"""
+        item = _value_object(OrderLineItem, item_data)
+        
         # Calculate subtotal for the item
-        quantity = item_data.get('quantity', 1)
-        unit_price = item_data.get('unit_price', 0)
-        customization_total = sum(c.get('price', 0) for c in item_data.get('customizations', []))
-        subtotal = (unit_price + customization_total) * quantity
+        customization_total = 0.0
+        for customization in item.customizations or ():
+            price = customization.get('price')
+            if price:
+                customization_total += price
+        subtotal = (item.unit_price + customization_total) * item.quantity
         
         # Add subtotal to item data
-        item_data['subtotal'] = subtotal
+        item.subtotal = subtotal
         
         # Add item to order
-        self.items.append(item_data)
+        if type(self.items) is not list:
+            self.items = list(self.items)
+        self.items.append(item)
         
-        # Recalculate total
-        self.calculate_total()
+        # Update totals incrementally (calculate_total recomputes from all items after bulk edits)
+        self._apply_subtotal(self.subtotal + subtotal)
         return self
 
     def update_status(self, new_status):
         """Update the order status and related timestamps"""
-        self.status = new_status
-        current_time = datetime.utcnow().isoformat()
+        self.status = intern(new_status)
+        current_time = _now_iso()
         
         # Update appropriate timestamp based on status
-        if new_status == 'confirmed':
-            self.confirmed_at = current_time
-        elif new_status == 'preparing':
-            self.preparing_at = current_time
-        elif new_status == 'ready':
-            self.ready_at = current_time
-            self.actual_ready_time = current_time
-        elif new_status == 'delivered':
-            self.delivered_at = current_time
-        elif new_status == 'completed':
-            self.completed_at = current_time
-        elif new_status == 'cancelled':
-            self.cancelled_at = current_time
+        for attr in _STATUS_TIMESTAMP_ATTRS.get(new_status, ()):
+            setattr(self, attr, current_time)
             
         self.updated_at = current_time
         return self
 
-def dict_to_order(data: Dict) -> Optional[Order]:
+def dict_to_order(data: Dict, cache: Optional[Dict] = None) -> Optional[Order]:
     """Convert dictionary to Order object"""
     if not data:
         return None
-    return Order(**data)
+    return _memoized_from_dict(Order, data, cache)
 
+# Shared read-only default for a review's media (add_media copies the media tree before changing it)
+_DEFAULT_REVIEW_MEDIA = MappingProxyType({
+    'video': MappingProxyType({
+        'url': '',
+        'duration': 0,
+        'content_type': '',
+        'upload_date': ''
+    }),
+    'audio': MappingProxyType({
+        'url': '',
+        'duration': 0,
+        'content_type': '',
+        'upload_date': ''
+    }),
+    'images': _EMPTY
+    # Each image in the list has format:
+    # {
+    #   'url': 'image_url',
+    #   'caption': 'image caption',
+    #   'upload_date': 'timestamp'
+    # }
+})
+
+# Flattened keys from which Review.from_dict builds each nested object
+_MEDIA_KEYS = (
+    'video_url', 'video_duration', 'video_content_type', 'video_upload_date',
+    'audio_url', 'audio_duration', 'audio_content_type', 'audio_upload_date', 'images'
+)
+_SUB_RATING_KEYS = ('food_rating', 'service_rating', 'ambiance_rating', 'value_rating', 'cleanliness_rating')
+_RESPONSE_KEYS = (
+    'response_text', 'response_author_id', 'response_author_title', 'response_date', 'response_is_edited'
+)
+
+@dataclass(slots=True)
 class Review:
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('_id')
-        self.created_at = kwargs.get('created_at', datetime.utcnow().isoformat())
-        self.updated_at = kwargs.get('updated_at', datetime.utcnow().isoformat())
-        self.is_active = kwargs.get('is_active', True)
-        
-        # Basic Review Information
-        self.review_number = kwargs.get('review_number', '')  # Unique review identifier
-        self.restaurant_id = kwargs.get('restaurant_id', '')  # Required relationship to restaurant
-        self.customer_id = kwargs.get('customer_id', '')  # Required relationship to customer
-        
-        # Optional relationships
-        self.staff_id = kwargs.get('staff_id', '')  # Optional reference to staff member
-        self.menu_item_id = kwargs.get('menu_item_id', '')  # Optional reference to menu item
-        self.order_id = kwargs.get('order_id', '')  # Optional reference to an order
-        
-        # Review content
-        self.rating = kwargs.get('rating', 0)  # Rating (typically 1-5)
-        self.title = kwargs.get('title', '')  # Optional review title
-        self.text = kwargs.get('text', '')  # Text content of the review
-        self.date = kwargs.get('date', datetime.utcnow().isoformat())  # When the review was written
-        
-        # Media content
-        self.media = kwargs.get('media', {
-            'video': {
-                'url': kwargs.get('video_url', ''),
-                'duration': kwargs.get('video_duration', 0),
-                'content_type': kwargs.get('video_content_type', ''),
-                'upload_date': kwargs.get('video_upload_date', '')
-            },
-            'audio': {
-                'url': kwargs.get('audio_url', ''),
-                'duration': kwargs.get('audio_duration', 0),
-                'content_type': kwargs.get('audio_content_type', ''),
-                'upload_date': kwargs.get('audio_upload_date', '')
-            },
-            'images': kwargs.get('images', [])
-            # Each image in the list has format:
-            # {
-            #   'url': 'image_url',
-            #   'caption': 'image caption',
-            #   'upload_date': 'timestamp'
-            # }
-        })
-        
-        # Review metadata
-        self.is_verified = kwargs.get('is_verified', False)  # Whether this is a verified review
-        self.verified_by = kwargs.get('verified_by', '')  # Who verified the review
-        self.verified_at = kwargs.get('verified_at', '')  # When the review was verified
-        self.source = kwargs.get('source', 'direct')  # direct, website, mobile_app, third_party
-        self.visit_date = kwargs.get('visit_date', '')  # When the customer visited the restaurant
-        
-        # Review categorization
-        self.tags = kwargs.get('tags', [])  # List of tags associated with this review
-        self.categories = kwargs.get('categories', [])  # food, service, ambiance, value, etc.
-        self.sentiment = kwargs.get('sentiment', '')  # positive, negative, neutral (could be auto-analyzed)
-        
-        # Specific ratings (sub-ratings)
-        self.sub_ratings = kwargs.get('sub_ratings', {
-            'food': kwargs.get('food_rating', 0),
-            'service': kwargs.get('service_rating', 0),
-            'ambiance': kwargs.get('ambiance_rating', 0),
-            'value': kwargs.get('value_rating', 0),
-            'cleanliness': kwargs.get('cleanliness_rating', 0)
-        })
-        
-        # Engagement metrics
-        self.helpful_count = kwargs.get('helpful_count', 0)  # Number of helpful votes
-        self.unhelpful_count = kwargs.get('unhelpful_count', 0)  # Number of unhelpful votes
-        self.view_count = kwargs.get('view_count', 0)  # Number of times the review was viewed
-        self.flag_count = kwargs.get('flag_count', 0)  # Number of times the review was flagged
-        self.flagged_reason = kwargs.get('flagged_reason', [])  # List of reasons the review was flagged
-        
-        # Response from restaurant
-        self.response = kwargs.get('response', {
-            'text': kwargs.get('response_text', ''),
-            'author_id': kwargs.get('response_author_id', ''),  # Staff member who responded
-            'author_title': kwargs.get('response_author_title', ''),  # e.g., "Manager", "Owner"
-            'date': kwargs.get('response_date', ''),
-            'is_edited': kwargs.get('response_is_edited', False)
-        })
-        
-        # Review state management
-        self.status = kwargs.get('status', 'published')  # draft, published, hidden, deleted, under_review
-        self.featured = kwargs.get('featured', False)  # Whether this is a featured review
-        self.featured_at = kwargs.get('featured_at', '')  # When the review was featured
-        self.featured_by = kwargs.get('featured_by', '')  # Who featured the review
-        
-        # For third-party reviews (if applicable)
-        self.third_party_id = kwargs.get('third_party_id', '')  # Review ID in third-party system
-        self.third_party_name = kwargs.get('third_party_name', '')  # e.g., Yelp, Google, TripAdvisor
-        self.third_party_url = kwargs.get('third_party_url', '')  # URL to the review on the third-party site
-        
-        # Administrative
-        self.notes = kwargs.get('notes', '')  # Internal notes
-        self.moderation_notes = kwargs.get('moderation_notes', '')  # Notes from content moderation
-        self.moderated_by = kwargs.get('moderated_by', '')  # Who moderated the review
-        self.moderated_at = kwargs.get('moderated_at', '')  # When the review was moderated
+    _INTERNED_FIELDS = ('source', 'status')
+    _VALID_STATUSES = frozenset(('draft', 'published', 'hidden', 'deleted', 'under_review'))
+    
+    id: Optional[str] = None  # Database _id
+    created_at: Optional[str] = None  # Defaults to now
+    updated_at: Optional[str] = None  # Defaults to now
+    is_active: bool = True
+    
+    # Basic Review Information
+    review_number: str = ''  # Unique review identifier
+    restaurant_id: str = ''  # Required relationship to restaurant
+    customer_id: str = ''  # Required relationship to customer
+    
+    # Optional relationships
+    staff_id: str = ''  # Optional reference to staff member
+    menu_item_id: str = ''  # Optional reference to menu item
+    order_id: str = ''  # Optional reference to an order
+    
+    # Review content
+    rating: int = 0  # Rating (typically 1-5)
+    title: str = ''  # Optional review title
+    text: str = ''  # Text content of the review
+    date: Optional[str] = None  # When the review was written (defaults to now)
+    
+    # Media content
+    media: Dict = field(default_factory=lambda: _DEFAULT_REVIEW_MEDIA)
+    
+    # Review metadata
+    is_verified: bool = False  # Whether this is a verified review
+    verified_by: str = ''  # Who verified the review
+    verified_at: str = ''  # When the review was verified
+    source: str = 'direct'  # direct, website, mobile_app, third_party
+    visit_date: str = ''  # When the customer visited the restaurant
+    
+    # Review categorization
+    tags: List = _EMPTY  # List of tags associated with this review
+    categories: List = _EMPTY  # food, service, ambiance, value, etc.
+    sentiment: str = ''  # positive, negative, neutral (could be auto-analyzed)
+    
+    # Specific ratings (sub-ratings)
+    sub_ratings: SubRatings = SubRatings()
+    
+    # Engagement metrics
+    helpful_count: int = 0  # Number of helpful votes
+    unhelpful_count: int = 0  # Number of unhelpful votes
+    view_count: int = 0  # Number of times the review was viewed
+    flag_count: int = 0  # Number of times the review was flagged
+    flagged_reason: List = _EMPTY  # List of reasons the review was flagged
+    
+    # Response from restaurant
+    response: ReviewResponse = ReviewResponse()
+    
+    # Review state management
+    status: str = 'published'  # draft, published, hidden, deleted, under_review
+    featured: bool = False  # Whether this is a featured review
+    featured_at: str = ''  # When the review was featured
+    featured_by: str = ''  # Who featured the review
+    
+    # For third-party reviews (if applicable)
+    third_party_id: str = ''  # Review ID in third-party system
+    third_party_name: str = ''  # e.g., Yelp, Google, TripAdvisor
+    third_party_url: str = ''  # URL to the review on the third-party site
+    
+    # Administrative
+    notes: str = ''  # Internal notes
+    moderation_notes: str = ''  # Notes from content moderation
+    moderated_by: str = ''  # Who moderated the review
+    moderated_at: str = ''  # When the review was moderated
 
+    def __post_init__(self):
+        now = _fill_timestamps(self)
+        _intern_fields(self)
+        if self.date is None:
+            self.date = now or _now_iso()
+        self.sub_ratings = _value_object(SubRatings, self.sub_ratings)
+        self.response = _value_object(ReviewResponse, self.response)
+    
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Build a review from a database dictionary, ignoring unknown keys"""
+        # Nested objects may also be supplied as flattened keys (video_url, food_rating, ...);
+        # with neither, the shared defaults are used
+        derived = {}
+        if 'media' not in data and any(key in data for key in _MEDIA_KEYS):
+            derived['media'] = {
+                'video': {
+                    'url': data.get('video_url', ''),
+                    'duration': data.get('video_duration', 0),
+                    'content_type': data.get('video_content_type', ''),
+                    'upload_date': data.get('video_upload_date', '')
+                },
+                'audio': {
+                    'url': data.get('audio_url', ''),
+                    'duration': data.get('audio_duration', 0),
+                    'content_type': data.get('audio_content_type', ''),
+                    'upload_date': data.get('audio_upload_date', '')
+                },
+                'images': data.get('images', [])
+            }
+        if 'sub_ratings' not in data and any(key in data for key in _SUB_RATING_KEYS):
+            derived['sub_ratings'] = SubRatings(
+                food=data.get('food_rating', 0),
+                service=data.get('service_rating', 0),
+                ambiance=data.get('ambiance_rating', 0),
+                value=data.get('value_rating', 0),
+                cleanliness=data.get('cleanliness_rating', 0)
+            )
+        if 'response' not in data and any(key in data for key in _RESPONSE_KEYS):
+            derived['response'] = ReviewResponse(
+                text=data.get('response_text', ''),
+                author_id=data.get('response_author_id', ''),
+                author_title=data.get('response_author_title', ''),
+                date=data.get('response_date', ''),
+                is_edited=data.get('response_is_edited', False)
+            )
+        return _from_dict(cls, data, **derived)
+    
+    @classmethod
+    def many(cls, dicts) -> List:
+        """Build reviews from an iterable of database dictionaries"""
+        # Flattened nested keys need from_dict's per-document handling
+        from_dict = cls.from_dict
+        return [from_dict(data) for data in dicts]
+    
     def to_dict(self) -> Dict:
         """Convert model to dictionary for database storage"""
-        return self.__dict__
+        return _slots_to_dict(self)
+    
+    __getstate__ = _getstate
+    __setstate__ = _setstate
+    
+    def _touch(self) -> None:
+        self.updated_at = _now_iso()
 
     def add_tag(self, tag: str) -> None:
         """Add a tag to the review"""
         if tag not in self.tags:
+            if type(self.tags) is not list:
+                self.tags = list(self.tags)
             self.tags.append(tag)
-            self.updated_at = datetime.utcnow().isoformat()
+            self._touch()
             
     def update_rating(self, new_rating: int) -> None:
         """Update the main rating"""
         if 1 <= new_rating <= 5:
             self.rating = new_rating
-            self.updated_at = datetime.utcnow().isoformat()
+            self._touch()
             
-    def add_helpful_vote(self) -> None:
-        """Increment the helpful vote count"""
+    def add_helpful_vote(self, touch: bool = True) -> None:
+        """Increment the helpful vote count (touch=False leaves updated_at for the caller to set once)"""
         self.helpful_count += 1
-        self.updated_at = datetime.utcnow().isoformat()
+        if touch:
+            self._touch()
         
-    def add_unhelpful_vote(self) -> None:
-        """Increment the unhelpful vote count"""
+    def add_unhelpful_vote(self, touch: bool = True) -> None:
+        """Increment the unhelpful vote count (touch=False leaves updated_at for the caller to set once)"""
         self.unhelpful_count += 1
-        self.updated_at = datetime.utcnow().isoformat()
+        if touch:
+            self._touch()
         
     def add_response(self, response_text: str, author_id: str, author_title: str) -> None:
         """Add or update a response from the restaurant"""
-        self.response = {
-            'text': response_text,
-            'author_id': author_id,
-            'author_title': author_title,
-            'date': datetime.utcnow().isoformat(),
-            'is_edited': bool(self.response.get('text'))  # True if there was a previous response
-        }
-        self.updated_at = datetime.utcnow().isoformat()
+        current_time = _now_iso()
+        self.response = ReviewResponse(
+            text=response_text,
+            author_id=author_id,
+            author_title=author_title,
+            date=current_time,
+            is_edited=bool(self.response.text)  # True if there was a previous response
+        )
+        self.updated_at = current_time
         
     def update_status(self, new_status: str) -> None:
         """Update the review status"""
-        valid_statuses = ['draft', 'published', 'hidden', 'deleted', 'under_review']
-        if new_status in valid_statuses:
-            self.status = new_status
-            self.updated_at = datetime.utcnow().isoformat()
+        if new_status in self._VALID_STATUSES:
+            self.status = intern(new_status)
+            self._touch()
             
     def add_media(self, media_type: str, media_data: Dict) -> None:
         """Add media to the review"""
+        current_time = _now_iso()
+        
+        # Copy the shared read-only default before changing it
+        if type(self.media) is MappingProxyType:
+            self.media = _thaw(self.media)
+        
         if media_type == 'image' and 'url' in media_data:
-            if 'images' not in self.media:
-                self.media['images'] = []
+            if type(self.media.get('images')) is not list:
+                self.media['images'] = list(self.media.get('images', ()))
                 
             image = {
                 'url': media_data['url'],
                 'caption': media_data.get('caption', ''),
-                'upload_date': datetime.utcnow().isoformat()
+                'upload_date': current_time
             }
             self.media['images'].append(image)
             
@@ -524,7 +875,7 @@ class Review:
                 'url': media_data['url'],
                 'duration': media_data.get('duration', 0),
                 'content_type': media_data.get('content_type', ''),
-                'upload_date': datetime.utcnow().isoformat()
+                'upload_date': current_time
             }
             
         elif media_type == 'audio' and 'url' in media_data:
@@ -532,13 +883,13 @@ class Review:
                 'url': media_data['url'],
                 'duration': media_data.get('duration', 0),
                 'content_type': media_data.get('content_type', ''),
-                'upload_date': datetime.utcnow().isoformat()
+                'upload_date': current_time
             }
             
-        self.updated_at = datetime.utcnow().isoformat()
+        self.updated_at = current_time
 
-def dict_to_review(data: Dict) -> Optional[Review]:
+def dict_to_review(data: Dict, cache: Optional[Dict] = None) -> Optional[Review]:
     """Convert dictionary to Review object"""
     if not data:
         return None
-    return Review(**data)
\ No newline at end of file
+    return _memoized_from_dict(Review, data, cache)
\ No newline at end of file
@@ -6,23 +6,158 @@ Protected by Entra ID (Azure AD) authentication.
 
 import logging
 import json
+import orjson
 import azure.functions as func
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, IndexModel
+from pymongo.errors import BulkWriteError, PyMongoError
 from bson import ObjectId
 import os
 from datetime import datetime
 import jwt
 import requests
+from requests.adapters import HTTPAdapter
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 
-# Helper function to handle ObjectId serialization
-class JSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super(JSONEncoder, self).default(obj)
+# Try to load environment variables once, at cold start
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.info("Loaded environment variables from .env file")
+except ImportError:
+    logging.info("python-dotenv not installed, using environment variables directly")
+except Exception as e:
+    logging.warning("Could not load .env file: %s", e)
+
+# Token validation parameters, read once per worker
+_TENANT_ID = os.environ.get('AZURE_TENANT_ID')
+_AUDIENCE = os.environ.get('AZURE_APP_AUDIENCE')
+_ISSUER = f"https://login.microsoftonline.com/{_TENANT_ID}/v2.0"
+_DISCOVERY_URL = f"{_ISSUER}/.well-known/openid-configuration"
+
+# OIDC discovery documents and signing keys change rarely, so cache them per worker
+_DISCOVERY_TTL = 86400  # 24 hours
+_JWKS_LIFESPAN = 86400  # 24 hours
+_DISCOVERY_CACHE: dict[str, tuple[float, dict]] = {}
+_JWK_CLIENTS: dict[str, jwt.PyJWKClient] = {}  # jwks_uri -> client with its own key cache
+_CACHE_LOCK = threading.Lock()
+
+# Shared HTTP session so connections to the identity provider are pooled
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+_HTTP_TIMEOUT = (2, 5)  # connect, read (seconds)
+
+# Verified token claims, keyed by a hash of the token (never the raw token)
+_TOKEN_CACHE_TTL = 300  # seconds
+_TOKEN_CACHE_MAXSIZE = 4096
+_TOKEN_EXP_LEEWAY = 30  # treat tokens this close to expiry as a miss
+_TOKEN_CACHE: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Database client is created once per worker and reused across invocations
+_MONGO_CLIENT: MongoClient | None = None
+_ORDER_COLLECTION = None
+_MONGO_LOCK = threading.Lock()
+
+# Indexes backing the lookups and the newest-first listings in get_order
+_ORDER_INDEXES = [
+    IndexModel([("customer_id", 1), ("created_at", -1), ("_id", -1)], name="customer_created"),
+    IndexModel([("restaurant_id", 1), ("status", 1), ("created_at", -1), ("_id", -1)], name="restaurant_status_created"),
+    IndexModel([("status", 1), ("created_at", -1), ("_id", -1)], name="status_created"),
+    IndexModel([("created_at", -1), ("_id", -1)], name="created"),
+    IndexModel([("order_number", 1)], name="order_number"),
+]
+
+# Order statuses, in lifecycle order, and the timestamp fields set on entering each one
+_ORDER_STATUSES = ("pending", "confirmed", "preparing", "ready", "delivered", "completed", "cancelled")
+_VALID_STATUSES = frozenset(_ORDER_STATUSES)
+_INVALID_STATUS_ERROR = f"Invalid status. Must be one of: {', '.join(_ORDER_STATUSES)}"
+# Fields a new order must include
+_REQUIRED_CREATE_FIELDS = frozenset(("restaurant_id", "items"))
+# Fields the totals are computed from; checked up front so bad input is a 400, not a TypeError
+_NUMERIC_FIELDS = ("tax_rate", "tip_percentage", "tax", "tip", "service_fee", "delivery_fee", "discount")
+_NUMERIC_ITEM_FIELDS = ("unit_price", "quantity")
+
+# Fields returned by list views unless ?fields= asks for others (fields=* returns whole orders)
+_LIST_PROJECTION = {
+    "_id": 1, "order_number": 1, "status": 1, "total": 1,
+    "created_at": 1, "customer_id": 1, "restaurant_id": 1
+}
+
+# Newest first; _id breaks ties between orders created at the same instant
+_LIST_SORT = {"created_at": -1, "_id": -1}
+
+_STATUS_TIMESTAMP_FIELDS = {
+    "confirmed": ("confirmed_at",),
+    "preparing": ("preparing_at",),
+    "ready": ("ready_at", "actual_ready_time"),
+    "delivered": ("delivered_at",),
+    "completed": ("completed_at",),
+    "cancelled": ("cancelled_at",),
+}
+
+# Helper functions to handle ObjectId serialization (orjson handles datetime natively)
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def _load_body(req):
+    """Parse the JSON request body (orjson.JSONDecodeError is a ValueError)"""
+    return orjson.loads(req.get_body())
+
+def _get_cached(url, cache, ttl, key=None):
+    """Fetch a JSON document, reusing a cached copy while it is fresh"""
+    key = key or url
+    with _CACHE_LOCK:
+        entry = cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        
+        response = _HTTP.get(url, timeout=_HTTP_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        cache[key] = (time.monotonic(), data)
+        return data
+
+def _get_jwk_client(jwks_uri):
+    """Return the shared PyJWKClient for a JWKS URI, creating it on first use"""
+    with _CACHE_LOCK:
+        client = _JWK_CLIENTS.get(jwks_uri)
+        if client is None:
+            client = jwt.PyJWKClient(jwks_uri, cache_keys=True, lifespan=_JWKS_LIFESPAN, timeout=sum(_HTTP_TIMEOUT))
+            _JWK_CLIENTS[jwks_uri] = client
+        return client
+
+def _get_cached_claims(token_key):
+    """Return cached claims for a token if they are still valid"""
+    with _TOKEN_CACHE_LOCK:
+        entry = _TOKEN_CACHE.get(token_key)
+        if not entry:
+            return None
+        
+        expires_at, claims = entry
+        if expires_at <= time.time() + _TOKEN_EXP_LEEWAY:
+            del _TOKEN_CACHE[token_key]
+            return None
+        
+        _TOKEN_CACHE.move_to_end(token_key)
+        return claims
+
+def _cache_claims(token_key, claims):
+    """Store verified claims until the token expires or the cache TTL elapses"""
+    expires_at = min(claims.get("exp", 0), time.time() + _TOKEN_CACHE_TTL)
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE[token_key] = (expires_at, claims)
+        _TOKEN_CACHE.move_to_end(token_key)
+        while len(_TOKEN_CACHE) > _TOKEN_CACHE_MAXSIZE:
+            _TOKEN_CACHE.popitem(last=False)
 
 def validate_token(req):
     """Validate the Entra ID access token from the request"""
@@ -39,48 +174,297 @@ def validate_token(req):
         
         token = token_parts[1]
         
-        # Get tenant ID from environment
-        tenant_id = os.environ.get('AZURE_TENANT_ID')
-        if not tenant_id:
-            return None, "Tenant ID is not configured"
+        # Skip signature verification for recently verified tokens
+        token_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached_claims = _get_cached_claims(token_key)
+        if cached_claims is not None:
+            return cached_claims, None
         
-        # Get token validation parameters from environment
-        audience = os.environ.get('AZURE_APP_AUDIENCE')
-        issuer = f"https://login.microsoftonline.com/{tenant_id}/v2.0"
+        if not _TENANT_ID:
+            return None, "Tenant ID is not configured"
         
         # Get OIDC discovery document to get the signing keys
-        discovery_url = f"{issuer}/.well-known/openid-configuration"
-        discovery_response = requests.get(discovery_url)
-        discovery_data = discovery_response.json()
+        discovery_data = _get_cached(_DISCOVERY_URL, _DISCOVERY_CACHE, _DISCOVERY_TTL, _TENANT_ID)
         jwks_uri = discovery_data['jwks_uri']
         
-        # Get the signing keys
-        jwks_response = requests.get(jwks_uri)
-        jwks_data = jwks_response.json()
+        # Get the signing key for the token (the client refetches the JWKS on an unknown kid)
+        signing_key = _get_jwk_client(jwks_uri).get_signing_key_from_jwt(token)
         
         # Validate the token
         decoded_token = jwt.decode(
             token,
-            jwks_data,
+            signing_key.key,
             algorithms=['RS256'],
-            audience=audience,
-            issuer=issuer,
-            options={"verify_signature": True}
+            audience=_AUDIENCE,
+            issuer=_ISSUER,
+            options={"verify_signature": True, "require": ["exp", "aud", "iss"]}
         )
         
+        # Only successful verifications are cached
+        _cache_claims(token_key, decoded_token)
+        
         return decoded_token, None
     
     except jwt.ExpiredSignatureError:
         return None, "Token has expired"
     except jwt.InvalidTokenError as e:
         return None, f"Invalid token: {str(e)}"
+    except jwt.PyJWKClientConnectionError as e:
+        logging.error("Error fetching signing keys: %s", e)
+        return None, f"Error validating token: {str(e)}"
+    except jwt.PyJWKClientError as e:
+        return None, f"Invalid token: {str(e)}"
     except Exception as e:
-        logging.error(f"Error validating token: {str(e)}")
+        logging.error("Error validating token: %s", e)
         return None, f"Error validating token: {str(e)}"
 
-def require_auth(func):
+def _get_collection():
+    """Return the order collection, connecting to the database on first use"""
+    global _MONGO_CLIENT, _ORDER_COLLECTION
+    
+    if _ORDER_COLLECTION is not None:
+        return _ORDER_COLLECTION
+    
+    with _MONGO_LOCK:
+        if _MONGO_CLIENT is None:
+            # Load database connection details
+            cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
+            database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
+            order_container = os.environ.get("ORDER_CONTAINER", "Orders")
+            
+            if not cosmos_db_connection_string:
+                return None
+            
+            # Connect to database
+            _MONGO_CLIENT = MongoClient(
+                cosmos_db_connection_string,
+                maxPoolSize=20,
+                minPoolSize=2,
+                socketTimeoutMS=30000,
+                connectTimeoutMS=30000,
+                retryWrites=False
+            )
+            collection = _MONGO_CLIENT[database_name][order_container]
+            
+            # Ensure indexes exist (idempotent, and only attempted once per worker)
+            try:
+                collection.create_indexes(_ORDER_INDEXES)
+            except Exception as e:
+                logging.warning("Failed to create order indexes: %s", e)
+            
+            _ORDER_COLLECTION = collection
+    
+    return _ORDER_COLLECTION
+
+def _totals_pipeline(update_data):
+    """Build an update pipeline that applies update_data and recomputes the order totals"""
+    # User-supplied values are wrapped in $literal so they are never read as expressions
+    stages = [
+        {"$set": {key: {"$literal": value} for key, value in update_data.items()}},
+        # Item subtotal: (unit price + customization prices) * quantity
+        {"$set": {"items": {"$map": {
+            "input": "$items",
+            "as": "item",
+            "in": {"$mergeObjects": ["$$item", {"subtotal": {"$multiply": [
+                {"$add": [
+                    {"$ifNull": ["$$item.unit_price", 0]},
+                    {"$sum": {"$ifNull": ["$$item.customizations.price", []]}}
+                ]},
+                {"$ifNull": ["$$item.quantity", 1]}
+            ]}}]}
+        }}}},
+        {"$set": {"subtotal": {"$sum": "$items.subtotal"}}},
+        # Tax is recalculated only when there is a tax rate
+        {"$set": {"tax": {"$cond": [
+            {"$gt": [{"$ifNull": ["$tax_rate", 0]}, 0]},
+            {"$round": [{"$multiply": ["$subtotal", "$tax_rate"]}, 2]},
+            "$tax"
+        ]}}},
+    ]
+    
+    # An explicit tip wins over the tip percentage
+    if "tip" not in update_data:
+        stages.append({"$set": {"tip": {"$cond": [
+            {"$gt": [{"$ifNull": ["$tip_percentage", 0]}, 0]},
+            {"$round": [{"$multiply": ["$subtotal", "$tip_percentage"]}, 2]},
+            "$tip"
+        ]}}})
+    
+    stages.append({"$set": {"total": {"$subtract": [
+        {"$add": [
+            "$subtotal",
+            {"$ifNull": ["$tax", 0]},
+            {"$ifNull": ["$tip", 0]},
+            {"$ifNull": ["$service_fee", 0]},
+            {"$ifNull": ["$delivery_fee", 0]}
+        ]},
+        {"$ifNull": ["$discount", 0]}
+    ]}}})
+    return stages
+
+def _missing_fields(order):
+    """Return the required fields missing from a new order, sorted"""
+    return sorted(_REQUIRED_CREATE_FIELDS - order.keys())
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _invalid_fields(order):
+    """Return the fields of an order body whose values the totals cannot be computed from"""
+    invalid = [field for field in _NUMERIC_FIELDS if field in order and not _is_number(order[field])]
+    
+    items = order.get("items", [])
+    if not isinstance(items, list):
+        return invalid + ["items"]
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            invalid.append(f"items[{index}]")
+            continue
+        invalid.extend(
+            f"items[{index}].{field}" for field in _NUMERIC_ITEM_FIELDS
+            if field in item and not _is_number(item[field])
+        )
+        customizations = item.get("customizations") or []
+        if not isinstance(customizations, list) or not all(
+            isinstance(customization, dict) and _is_number(customization.get("price", 0))
+            for customization in customizations
+        ):
+            invalid.append(f"items[{index}].customizations")
+    return invalid
+
+def _prepare_order(order, created_by, now, order_number_suffix=""):
+    """Fill in timestamps, defaults and financial totals for a new order"""
+    # Add timestamps
+    current_time = now.isoformat()
+    order["created_at"] = current_time
+    order["updated_at"] = current_time
+    order["created_by"] = created_by
+    
+    # Generate order number if not provided
+    if "order_number" not in order:
+        # Simple order number generation - could be more sophisticated in production
+        prefix = "ORD"
+        timestamp = now.strftime('%Y%m%d%H%M%S')
+        order["order_number"] = f"{prefix}-{timestamp}{order_number_suffix}"
+    
+    # Set default values
+    if "is_active" not in order:
+        order["is_active"] = True
+    if "status" not in order:
+        order["status"] = "pending"
+    if "payment_status" not in order:
+        order["payment_status"] = "unpaid"
+    
+    # Calculate subtotal from items
+    subtotal = _price_items(order.get("items", []))
+    
+    # Set or update subtotal
+    order["subtotal"] = subtotal
+    
+    # Calculate tax if tax_rate is provided
+    tax_rate = order.get("tax_rate", 0)
+    if tax_rate > 0:
+        order["tax"] = round(subtotal * tax_rate, 2)
+    elif "tax" not in order:
+        order["tax"] = 0
+    
+    # Calculate tip if tip_percentage is provided
+    tip_percentage = order.get("tip_percentage", 0)
+    if tip_percentage > 0 and "tip" not in order:
+        order["tip"] = round(subtotal * tip_percentage, 2)
+    elif "tip" not in order:
+        order["tip"] = 0
+    
+    # Set service fee and delivery fee to 0 if not provided
+    if "service_fee" not in order:
+        order["service_fee"] = 0
+    if "delivery_fee" not in order:
+        order["delivery_fee"] = 0
+    if "discount" not in order:
+        order["discount"] = 0
+    
+    # Calculate total
+    order["total"] = (
+        order["subtotal"] + 
+        order["tax"] + 
+        order["tip"] + 
+        order["service_fee"] + 
+        order["delivery_fee"] - 
+        order["discount"]
+    )
+
+def _status_update(new_status, updated_by, now_iso):
+    """Build the $set document for moving orders to a new status"""
+    update_data = {
+        "status": new_status,
+        "updated_at": now_iso,
+        "updated_by": updated_by
+    }
+    
+    # Add status-specific timestamp
+    for timestamp_field in _STATUS_TIMESTAMP_FIELDS.get(new_status, ()):
+        update_data[timestamp_field] = now_iso
+    return update_data
+
+def _price_items(items):
+    """Set each item's subtotal ((unit price + customizations) * quantity) and return their sum"""
+    subtotal = 0
+    for item in items:
+        get = item.get
+        customization_total = 0
+        for customization in get("customizations") or ():
+            customization_total += customization.get("price", 0)
+        item_subtotal = (get("unit_price", 0) + customization_total) * get("quantity", 1)
+        
+        # Update or add subtotal to item
+        item["subtotal"] = item_subtotal
+        subtotal += item_subtotal
+    return subtotal
+
+def _list_projection(req):
+    """Build the projection for list views from ?fields= (None means whole documents)"""
+    fields = req.params.get('fields', '')
+    if fields.strip() == "*":
+        return None
+    fields = [f.strip() for f in fields.split(",") if f.strip()]
+    if not fields:
+        return _LIST_PROJECTION
+    # created_at (and the default _id) are always kept: they form the next-page cursor
+    return {**{f: 1 for f in fields}, "created_at": 1}
+
+def _keyset_find(collection, query, after_created_at, after_id, limit, projection=None):
+    """Return the orders that follow the (created_at, _id) cursor of the previous page, newest first"""
+    query = {**query, "$or": [
+        {"created_at": {"$lt": after_created_at}},
+        {"created_at": after_created_at, "_id": {"$lt": after_id}}
+    ]}
+    return list(collection.find(query, projection).sort(list(_LIST_SORT.items())).limit(limit))
+
+def _next_cursor(orders, limit):
+    """Cursor parameters for the page after a full page of orders (None after the last page)"""
+    if len(orders) < limit:
+        return None
+    last = orders[-1]
+    return {"after_created_at": last.get("created_at"), "after_id": str(last["_id"])}
+
+def _paginated_find(collection, query, page, limit, projection=None):
+    """Return one page of matching orders (newest first) and the total match count in one query"""
+    data = [{"$skip": (page - 1) * limit}, {"$limit": limit}]
+    if projection:
+        data.append({"$project": projection})
+    
+    # Sort before $facet: sub-pipelines cannot use indexes, the top-level $sort can
+    result = next(collection.aggregate([
+        {"$match": query},
+        {"$sort": _LIST_SORT},
+        {"$facet": {"data": data, "count": [{"$count": "n"}]}}
+    ]))
+    total_count = result["count"][0]["n"] if result["count"] else 0
+    return result["data"], total_count
+
+def require_auth(handler):
     """Decorator to require authentication for an endpoint"""
-    @wraps(func)
+    @wraps(handler)
     def wrapper(req, collection):
         # Validate the token
         token_data, error = validate_token(req)
@@ -96,7 +480,7 @@ def require_auth(func):
         req.token_data = token_data
         
         # Call the original function
-        return func(req, collection)
+        return handler(req, collection)
     
     return wrapper
 
@@ -104,37 +488,16 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('Processing order CRUD operation.')
     
     try:
-        # Try to load environment variables
-        try:
-            from dotenv import load_dotenv
-            load_dotenv()
-            logging.info("Loaded environment variables from .env file")
-        except ImportError:
-            logging.info("python-dotenv not installed, using environment variables directly")
-        except Exception as e:
-            logging.warning(f"Could not load .env file: {str(e)}")
-        
-        # Load database connection details
-        cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
-        database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
-        order_container = os.environ.get("ORDER_CONTAINER", "Orders")
-        
-        if not cosmos_db_connection_string:
+        # Reuse the worker's database connection
+        order_collection = _get_collection()
+        
+        if order_collection is None:
             return func.HttpResponse(
                 json.dumps({"error": "Database connection string is not configured"}),
                 status_code=500,
                 mimetype="application/json"
             )
         
-        # Connect to database
-        client = MongoClient(
-            cosmos_db_connection_string,
-            socketTimeoutMS=30000,
-            connectTimeoutMS=30000
-        )
-        database = client[database_name]
-        order_collection = database[order_container]
-        
         # Get operation type from route or query parameter
         route = req.route_params.get('operation', '')
         operation = route if route else req.params.get('operation', 'get')
@@ -150,6 +513,8 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             return delete_order(req, order_collection)
         elif req.method == 'PUT' and operation.lower() == 'status':
             return update_order_status(req, order_collection)
+        elif req.method == 'PUT' and operation.lower() == 'bulk_status':
+            return update_order_statuses(req, order_collection)
         else:
             return func.HttpResponse(
                 json.dumps({"error": f"Unsupported operation: {operation}"}),
@@ -158,7 +523,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             )
     
     except Exception as e:
-        logging.error(f"Error processing order operation: {str(e)}")
+        logging.error("Error processing order operation: %s", e)
         return func.HttpResponse(
             json.dumps({"error": f"An unexpected error occurred: {str(e)}"}),
             status_code=500,
@@ -167,100 +532,46 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
 @require_auth
 def create_order(req: func.HttpRequest, collection) -> func.HttpResponse:
-    """Create a new order"""
+    """Create a new order, or a batch of orders from a JSON array"""
     try:
         # Get request body
-        req_body = req.get_json()
+        req_body = _load_body(req)
+        
+        # A JSON array creates a batch of orders with a single insert
+        if isinstance(req_body, list):
+            return _create_orders(req, collection, req_body)
+        if not isinstance(req_body, dict):
+            return func.HttpResponse(
+                json.dumps({"error": "Request body must be an order or a non-empty array of orders"}),
+                status_code=400,
+                mimetype="application/json"
+            )
         
         # Validate required fields
-        required_fields = ["restaurant_id", "items"]
-        if not all(field in req_body for field in required_fields):
-            missing_fields = [field for field in required_fields if field not in req_body]
+        missing_fields = _missing_fields(req_body)
+        if missing_fields:
             return func.HttpResponse(
                 json.dumps({"error": f"Missing required fields: {', '.join(missing_fields)}"}),
                 status_code=400,
                 mimetype="application/json"
             )
         
-        # Add timestamps
-        current_time = datetime.utcnow().isoformat()
-        req_body["created_at"] = current_time
-        req_body["updated_at"] = current_time
-        req_body["created_by"] = req.token_data.get("preferred_username", "unknown")
-        
-        # Generate order number if not provided
-        if "order_number" not in req_body:
-            # Simple order number generation - could be more sophisticated in production
-            prefix = "ORD"
-            timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-            req_body["order_number"] = f"{prefix}-{timestamp}"
-        
-        # Set default values
-        if "is_active" not in req_body:
-            req_body["is_active"] = True
-        if "status" not in req_body:
-            req_body["status"] = "pending"
-        if "payment_status" not in req_body:
-            req_body["payment_status"] = "unpaid"
-        
-        # Initialize financial calculations if not provided
-        items = req_body.get("items", [])
-        subtotal = 0
-        
-        # Calculate subtotal from items if not explicitly provided
-        for item in items:
-            quantity = item.get("quantity", 1)
-            unit_price = item.get("unit_price", 0)
-            customization_total = sum(c.get("price", 0) for c in item.get("customizations", []))
-            item_subtotal = (unit_price + customization_total) * quantity
-            
-            # Update or add subtotal to item
-            item["subtotal"] = item_subtotal
-            subtotal += item_subtotal
-        
-        # Set or update subtotal
-        req_body["subtotal"] = subtotal
-        
-        # Calculate tax if tax_rate is provided
-        tax_rate = req_body.get("tax_rate", 0)
-        if tax_rate > 0:
-            req_body["tax"] = round(subtotal * tax_rate, 2)
-        elif "tax" not in req_body:
-            req_body["tax"] = 0
-        
-        # Calculate tip if tip_percentage is provided
-        tip_percentage = req_body.get("tip_percentage", 0)
-        if tip_percentage > 0 and "tip" not in req_body:
-            req_body["tip"] = round(subtotal * tip_percentage, 2)
-        elif "tip" not in req_body:
-            req_body["tip"] = 0
-        
-        # Set service fee and delivery fee to 0 if not provided
-        if "service_fee" not in req_body:
-            req_body["service_fee"] = 0
-        if "delivery_fee" not in req_body:
-            req_body["delivery_fee"] = 0
-        if "discount" not in req_body:
-            req_body["discount"] = 0
-        
-        # Calculate total
-        req_body["total"] = (
-            req_body["subtotal"] + 
-            req_body["tax"] + 
-            req_body["tip"] + 
-            req_body["service_fee"] + 
-            req_body["delivery_fee"] - 
-            req_body["discount"]
-        )
+        # Validate the values the totals are computed from
+        invalid_fields = _invalid_fields(req_body)
+        if invalid_fields:
+            return func.HttpResponse(
+                json.dumps({"error": f"Invalid field values: {', '.join(invalid_fields)}"}),
+                status_code=400,
+                mimetype="application/json"
+            )
         
-        # Create the order
-        result = collection.insert_one(req_body)
+        _prepare_order(req_body, req.token_data.get("preferred_username", "unknown"), datetime.utcnow())
         
-        # Get created order with _id
-        created_order = collection.find_one({"_id": result.inserted_id})
+        # Create the order (insert_one adds the new _id to req_body)
+        collection.insert_one(req_body)
         
         return func.HttpResponse(
-            json.dumps({"message": "Order created successfully", "order": created_order}, cls=JSONEncoder),
+            _dumps({"message": "Order created successfully", "order": req_body}),
             status_code=201,
             mimetype="application/json"
         )
@@ -271,14 +582,70 @@ def create_order(req: func.HttpRequest, collection) -> func.HttpResponse:
             status_code=400,
             mimetype="application/json"
         )
-    except Exception as e:
-        logging.error(f"Error creating order: {str(e)}")
+    except (PyMongoError, KeyError) as e:
+        logging.error("Error creating order: %s", e)
         return func.HttpResponse(
             json.dumps({"error": f"Failed to create order: {str(e)}"}),
             status_code=500,
             mimetype="application/json"
         )
 
+def _create_orders(req, collection, orders):
+    """Create a batch of orders with one insert_many"""
+    if not orders or not all(isinstance(order, dict) for order in orders):
+        return func.HttpResponse(
+            json.dumps({"error": "Request body must be an order or a non-empty array of orders"}),
+            status_code=400,
+            mimetype="application/json"
+        )
+    
+    # Validate every order before inserting any of them
+    for index, order in enumerate(orders):
+        missing_fields = _missing_fields(order)
+        if missing_fields:
+            return func.HttpResponse(
+                json.dumps({"error": f"Order {index}: Missing required fields: {', '.join(missing_fields)}"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        invalid_fields = _invalid_fields(order)
+        if invalid_fields:
+            return func.HttpResponse(
+                json.dumps({"error": f"Order {index}: Invalid field values: {', '.join(invalid_fields)}"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+    
+    # Number the generated order numbers so orders created in the same second stay distinct
+    created_by = req.token_data.get("preferred_username", "unknown")
+    now = datetime.utcnow()
+    for index, order in enumerate(orders, 1):
+        _prepare_order(order, created_by, now, f"-{index}")
+    
+    try:
+        result = collection.insert_many(orders, ordered=False)
+    except BulkWriteError as e:
+        # Unordered inserts continue past failures, so report how many made it
+        logging.error("Error creating orders: %s", e)
+        return func.HttpResponse(
+            json.dumps({
+                "error": "Some orders could not be created",
+                "inserted_count": e.details.get("nInserted", 0),
+                "failed_count": len(e.details.get("writeErrors", []))
+            }),
+            status_code=207,
+            mimetype="application/json"
+        )
+    
+    return func.HttpResponse(
+        _dumps({
+            "message": f"{len(result.inserted_ids)} orders created successfully",
+            "order_ids": result.inserted_ids
+        }),
+        status_code=201,
+        mimetype="application/json"
+    )
+
 @require_auth
 def get_order(req: func.HttpRequest, collection) -> func.HttpResponse:
     """Get order(s) by ID, order number, customer ID, or restaurant ID"""
@@ -292,15 +659,15 @@ def get_order(req: func.HttpRequest, collection) -> func.HttpResponse:
         
         # If an ID was provided, get order by ID
         if order_id:
-            try:
-                order = collection.find_one({"_id": ObjectId(order_id)})
-            except:
+            if not ObjectId.is_valid(order_id):
                 return func.HttpResponse(
                     json.dumps({"error": "Invalid order ID format"}),
                     status_code=400,
                     mimetype="application/json"
                 )
             
+            order = collection.find_one({"_id": ObjectId(order_id)})
+            
             if not order:
                 return func.HttpResponse(
                     json.dumps({"error": "Order not found"}),
@@ -309,7 +676,7 @@ def get_order(req: func.HttpRequest, collection) -> func.HttpResponse:
                 )
             
             return func.HttpResponse(
-                json.dumps({"order": order}, cls=JSONEncoder),
+                _dumps({"order": order}),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -326,80 +693,27 @@ def get_order(req: func.HttpRequest, collection) -> func.HttpResponse:
                 )
             
             return func.HttpResponse(
-                json.dumps({"order": order}, cls=JSONEncoder),
+                _dumps({"order": order}),
                 status_code=200,
                 mimetype="application/json"
             )
         
-        # If customer ID was provided, get all orders for that customer
-        elif customer_id:
-            # Get pagination parameters
-            page = int(req.params.get('page', 1))
-            limit = int(req.params.get('limit', 10))
-            skip = (page - 1) * limit
-            
-            # Build query
-            query = {"customer_id": customer_id}
-            if status:
-                query["status"] = status
-            
-            # Execute query
-            orders = list(collection.find(query).sort("created_at", -1).skip(skip).limit(limit))
-            total_count = collection.count_documents(query)
-            
-            return func.HttpResponse(
-                json.dumps({
-                    "orders": orders,
-                    "count": len(orders),
-                    "total_count": total_count,
-                    "page": page,
-                    "total_pages": (total_count + limit - 1) // limit
-                }, cls=JSONEncoder),
-                status_code=200,
-                mimetype="application/json"
-            )
+        # Otherwise list orders for a customer, a restaurant, or all orders, with pagination
+        page = int(req.params.get('page', 1))
+        limit = int(req.params.get('limit', 10))
         
-        # If restaurant ID was provided, get all orders for that restaurant
+        # Build query
+        if customer_id:
+            query = {"customer_id": customer_id}
         elif restaurant_id:
-            # Get pagination parameters
-            page = int(req.params.get('page', 1))
-            limit = int(req.params.get('limit', 10))
-            skip = (page - 1) * limit
-            
-            # Build query
             query = {"restaurant_id": restaurant_id}
-            if status:
-                query["status"] = status
-            
-            # Execute query
-            orders = list(collection.find(query).sort("created_at", -1).skip(skip).limit(limit))
-            total_count = collection.count_documents(query)
-            
-            return func.HttpResponse(
-                json.dumps({
-                    "orders": orders,
-                    "count": len(orders),
-                    "total_count": total_count,
-                    "page": page,
-                    "total_pages": (total_count + limit - 1) // limit
-                }, cls=JSONEncoder),
-                status_code=200,
-                mimetype="application/json"
-            )
-        
-        # If no specific ID was provided, get all orders with pagination
         else:
-            # Get pagination parameters
-            page = int(req.params.get('page', 1))
-            limit = int(req.params.get('limit', 10))
-            skip = (page - 1) * limit
-            
-            # Build query
             query = {}
-            if status:
-                query["status"] = status
-            
-            # Time range filtering
+        if status:
+            query["status"] = status
+        
+        # Time range filtering (only when listing all orders)
+        if not customer_id and not restaurant_id:
             start_date = req.params.get('start_date')
             end_date = req.params.get('end_date')
             if start_date or end_date:
@@ -408,25 +722,50 @@ def get_order(req: func.HttpRequest, collection) -> func.HttpResponse:
                     query["created_at"]["$gte"] = start_date
                 if end_date:
                     query["created_at"]["$lte"] = end_date
+        
+        projection = _list_projection(req)
+        
+        # Keyset pagination: continue after the last order of the previous page, which
+        # walks the index instead of skipping over every earlier page
+        after_created_at = req.params.get('after_created_at')
+        after_id = req.params.get('after_id')
+        if after_created_at or after_id:
+            if not after_created_at or not ObjectId.is_valid(after_id or ""):
+                return func.HttpResponse(
+                    json.dumps({"error": "after_created_at and a valid after_id are required together"}),
+                    status_code=400,
+                    mimetype="application/json"
+                )
             
-            # Execute query
-            orders = list(collection.find(query).sort("created_at", -1).skip(skip).limit(limit))
-            total_count = collection.count_documents(query)
-            
+            orders = _keyset_find(collection, query, after_created_at, ObjectId(after_id), limit, projection)
             return func.HttpResponse(
-                json.dumps({
+                _dumps({
                     "orders": orders,
                     "count": len(orders),
-                    "total_count": total_count,
-                    "page": page,
-                    "total_pages": (total_count + limit - 1) // limit
-                }, cls=JSONEncoder),
+                    "next_cursor": _next_cursor(orders, limit)
+                }),
                 status_code=200,
                 mimetype="application/json"
             )
+        
+        # Execute query
+        orders, total_count = _paginated_find(collection, query, page, limit, projection)
+        
+        return func.HttpResponse(
+            _dumps({
+                "orders": orders,
+                "count": len(orders),
+                "total_count": total_count,
+                "page": page,
+                "total_pages": (total_count + limit - 1) // limit,
+                "next_cursor": _next_cursor(orders, limit)
+            }),
+            status_code=200,
+            mimetype="application/json"
+        )
     
-    except Exception as e:
-        logging.error(f"Error retrieving order(s): {str(e)}")
+    except (PyMongoError, ValueError, KeyError) as e:
+        logging.error("Error retrieving order(s): %s", e)
         return func.HttpResponse(
             json.dumps({"error": f"Failed to retrieve order(s): {str(e)}"}),
             status_code=500,
@@ -447,8 +786,30 @@ def update_order(req: func.HttpRequest, collection) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
+        if not ObjectId.is_valid(order_id):
+            return func.HttpResponse(
+                json.dumps({"error": "Invalid order ID format"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
         # Get request body
-        req_body = req.get_json()
+        req_body = _load_body(req)
+        if not isinstance(req_body, dict):
+            return func.HttpResponse(
+                json.dumps({"error": "Request body must be a JSON object"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
+        # Validate the values the totals are recomputed from
+        invalid_fields = _invalid_fields(req_body)
+        if invalid_fields:
+            return func.HttpResponse(
+                json.dumps({"error": f"Invalid field values: {', '.join(invalid_fields)}"}),
+                status_code=400,
+                mimetype="application/json"
+            )
         
         # Add updated timestamp and user info
         req_body["updated_at"] = datetime.utcnow().isoformat()
@@ -458,89 +819,30 @@ def update_order(req: func.HttpRequest, collection) -> func.HttpResponse:
         if "_id" in req_body:
             del req_body["_id"]
         
-        try:
-            # Check if order exists
-            existing_order = collection.find_one({"_id": ObjectId(order_id)})
-            if not existing_order:
-                return func.HttpResponse(
-                    json.dumps({"error": "Order not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # If items are updated, recalculate subtotal and total
-            if "items" in req_body:
-                items = req_body.get("items", [])
-                subtotal = 0
-                
-                # Calculate subtotal from items
-                for item in items:
-                    quantity = item.get("quantity", 1)
-                    unit_price = item.get("unit_price", 0)
-                    customization_total = sum(c.get("price", 0) for c in item.get("customizations", []))
-                    item_subtotal = (unit_price + customization_total) * quantity
-                    
-                    # Update or add subtotal to item
-                    item["subtotal"] = item_subtotal
-                    subtotal += item_subtotal
-                
-                # Set or update subtotal
-                req_body["subtotal"] = subtotal
-                
-                # Calculate tax if tax_rate is provided or use existing tax_rate
-                tax_rate = req_body.get("tax_rate", existing_order.get("tax_rate", 0))
-                if tax_rate > 0:
-                    req_body["tax"] = round(subtotal * tax_rate, 2)
-                
-                # Calculate tip if tip_percentage is provided or use existing tip
-                tip_percentage = req_body.get("tip_percentage", existing_order.get("tip_percentage", 0))
-                if tip_percentage > 0 and "tip" not in req_body:
-                    req_body["tip"] = round(subtotal * tip_percentage, 2)
-                
-                # Calculate total if financial fields are updated
-                service_fee = req_body.get("service_fee", existing_order.get("service_fee", 0))
-                delivery_fee = req_body.get("delivery_fee", existing_order.get("delivery_fee", 0))
-                discount = req_body.get("discount", existing_order.get("discount", 0))
-                tax = req_body.get("tax", existing_order.get("tax", 0))
-                tip = req_body.get("tip", existing_order.get("tip", 0))
-                
-                req_body["total"] = (
-                    subtotal + 
-                    tax + 
-                    tip + 
-                    service_fee + 
-                    delivery_fee - 
-                    discount
-                )
-            
-            # Update the order
-            result = collection.update_one(
-                {"_id": ObjectId(order_id)},
-                {"$set": req_body}
-            )
-            
-            if result.modified_count > 0:
-                # Get updated order
-                updated_order = collection.find_one({"_id": ObjectId(order_id)})
-                
-                return func.HttpResponse(
-                    json.dumps({"message": "Order updated successfully", "order": updated_order}, cls=JSONEncoder),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "No changes made to order"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
+        # Apply the update and, when items change, recompute the totals server-side in the
+        # same round trip; the existing order's rates, fees and tip are the fallbacks
+        if "items" in req_body:
+            update = _totals_pipeline(req_body)
+        else:
+            update = {"$set": req_body}
         
-        except:
+        updated_order = collection.find_one_and_update(
+            {"_id": ObjectId(order_id)},
+            update,
+            return_document=ReturnDocument.AFTER
+        )
+        if not updated_order:
             return func.HttpResponse(
-                json.dumps({"error": "Invalid order ID format"}),
-                status_code=400,
+                json.dumps({"error": "Order not found"}),
+                status_code=404,
                 mimetype="application/json"
             )
+        
+        return func.HttpResponse(
+            _dumps({"message": "Order updated successfully", "order": updated_order}),
+            status_code=200,
+            mimetype="application/json"
+        )
     
     except ValueError:
         return func.HttpResponse(
@@ -548,8 +850,8 @@ def update_order(req: func.HttpRequest, collection) -> func.HttpResponse:
             status_code=400,
             mimetype="application/json"
         )
-    except Exception as e:
-        logging.error(f"Error updating order: {str(e)}")
+    except (PyMongoError, KeyError) as e:
+        logging.error("Error updating order: %s", e)
         return func.HttpResponse(
             json.dumps({"error": f"Failed to update order: {str(e)}"}),
             status_code=500,
@@ -570,11 +872,18 @@ def update_order_status(req: func.HttpRequest, collection) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
+        if not ObjectId.is_valid(order_id):
+            return func.HttpResponse(
+                json.dumps({"error": "Invalid order ID format"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
         # Get request body
-        req_body = req.get_json()
+        req_body = _load_body(req)
         
         # Validate that status is provided
-        if "status" not in req_body:
+        if not isinstance(req_body, dict) or "status" not in req_body:
             return func.HttpResponse(
                 json.dumps({"error": "Status is required for status update"}),
                 status_code=400,
@@ -582,90 +891,118 @@ def update_order_status(req: func.HttpRequest, collection) -> func.HttpResponse:
             )
         
         new_status = req_body["status"]
-        valid_statuses = ["pending", "confirmed", "preparing", "ready", "delivered", "completed", "cancelled"]
         
-        if new_status not in valid_statuses:
+        if not isinstance(new_status, str) or new_status not in _VALID_STATUSES:
             return func.HttpResponse(
-                json.dumps({"error": f"Invalid status. Must be one of: {', '.join(valid_statuses)}"}),
+                json.dumps({"error": _INVALID_STATUS_ERROR}),
                 status_code=400,
                 mimetype="application/json"
             )
         
-        try:
-            # Check if order exists
-            existing_order = collection.find_one({"_id": ObjectId(order_id)})
-            if not existing_order:
-                return func.HttpResponse(
-                    json.dumps({"error": "Order not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Prepare update data
-            update_data = {
-                "status": new_status,
-                "updated_at": datetime.utcnow().isoformat(),
-                "updated_by": req.token_data.get("preferred_username", "unknown")
-            }
-            
-            # Add status-specific timestamp
-            current_time = datetime.utcnow().isoformat()
-            if new_status == "confirmed":
-                update_data["confirmed_at"] = current_time
-            elif new_status == "preparing":
-                update_data["preparing_at"] = current_time
-            elif new_status == "ready":
-                update_data["ready_at"] = current_time
-                update_data["actual_ready_time"] = current_time
-            elif new_status == "delivered":
-                update_data["delivered_at"] = current_time
-            elif new_status == "completed":
-                update_data["completed_at"] = current_time
-            elif new_status == "cancelled":
-                update_data["cancelled_at"] = current_time
-            
-            # Update the order
-            result = collection.update_one(
-                {"_id": ObjectId(order_id)},
-                {"$set": update_data}
+        # Prepare update data
+        update_data = _status_update(
+            new_status,
+            req.token_data.get("preferred_username", "unknown"),
+            datetime.utcnow().isoformat()
+        )
+        
+        # Update the order and get it back in one round trip (None means it does not exist)
+        updated_order = collection.find_one_and_update(
+            {"_id": ObjectId(order_id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        if not updated_order:
+            return func.HttpResponse(
+                json.dumps({"error": "Order not found"}),
+                status_code=404,
+                mimetype="application/json"
+            )
+        
+        return func.HttpResponse(
+            _dumps({
+                "message": f"Order status updated to {new_status} successfully",
+                "order": updated_order
+            }),
+            status_code=200,
+            mimetype="application/json"
+        )
+    
+    except ValueError:
+        return func.HttpResponse(
+            json.dumps({"error": "Invalid request body. Please provide valid JSON."}),
+            status_code=400,
+            mimetype="application/json"
+        )
+    except (PyMongoError, KeyError) as e:
+        logging.error("Error updating order status: %s", e)
+        return func.HttpResponse(
+            json.dumps({"error": f"Failed to update order status: {str(e)}"}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+@require_auth
+def update_order_statuses(req: func.HttpRequest, collection) -> func.HttpResponse:
+    """Update the status of several orders at once"""
+    try:
+        # Get request body: {"ids": [...], "status": "..."}
+        req_body = _load_body(req)
+        
+        order_ids = req_body.get("ids") if isinstance(req_body, dict) else None
+        if not isinstance(order_ids, list) or not order_ids:
+            return func.HttpResponse(
+                json.dumps({"error": "A non-empty list of order IDs is required for bulk status update"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
+        new_status = req_body.get("status")
+        if not isinstance(new_status, str) or new_status not in _VALID_STATUSES:
+            return func.HttpResponse(
+                json.dumps({"error": _INVALID_STATUS_ERROR}),
+                status_code=400,
+                mimetype="application/json"
             )
-            
-            if result.modified_count > 0:
-                # Get updated order
-                updated_order = collection.find_one({"_id": ObjectId(order_id)})
-                
-                return func.HttpResponse(
-                    json.dumps({
-                        "message": f"Order status updated to {new_status} successfully",
-                        "order": updated_order
-                    }, cls=JSONEncoder),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "No changes made to order status"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
         
-        except:
+        if not all(isinstance(order_id, str) and ObjectId.is_valid(order_id) for order_id in order_ids):
             return func.HttpResponse(
                 json.dumps({"error": "Invalid order ID format"}),
                 status_code=400,
                 mimetype="application/json"
             )
+        
+        # Every order gets the same update, so one update_many covers the batch
+        update_data = _status_update(
+            new_status,
+            req.token_data.get("preferred_username", "unknown"),
+            datetime.utcnow().isoformat()
+        )
+        result = collection.update_many(
+            {"_id": {"$in": [ObjectId(order_id) for order_id in order_ids]}},
+            {"$set": update_data}
+        )
+        
+        return func.HttpResponse(
+            json.dumps({
+                "message": f"Order status updated to {new_status} successfully",
+                "matched_count": result.matched_count,
+                "modified_count": result.modified_count
+            }),
+            status_code=200,
+            mimetype="application/json"
+        )
     
-    except ValueError:
+    except (ValueError, AttributeError):
         return func.HttpResponse(
             json.dumps({"error": "Invalid request body. Please provide valid JSON."}),
             status_code=400,
             mimetype="application/json"
         )
-    except Exception as e:
-        logging.error(f"Error updating order status: {str(e)}")
+    except (PyMongoError, KeyError) as e:
+        logging.error("Error updating order statuses: %s", e)
         return func.HttpResponse(
-            json.dumps({"error": f"Failed to update order status: {str(e)}"}),
+            json.dumps({"error": f"Failed to update order statuses: {str(e)}"}),
             status_code=500,
             mimetype="application/json"
         )
@@ -684,70 +1021,61 @@ def delete_order(req: func.HttpRequest, collection) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
+        if not ObjectId.is_valid(order_id):
+            return func.HttpResponse(
+                json.dumps({"error": "Invalid order ID format"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
+        # Get cancellation reason from request body
+        cancellation_reason = ""
         try:
-            # Check if order exists
-            existing_order = collection.find_one({"_id": ObjectId(order_id)})
-            if not existing_order:
-                return func.HttpResponse(
-                    json.dumps({"error": "Order not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Check if order is already cancelled
-            if existing_order.get("status") == "cancelled":
-                return func.HttpResponse(
-                    json.dumps({"message": "Order is already cancelled"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            
-            # Get cancellation reason from request body
-            cancellation_reason = ""
-            try:
-                req_body = req.get_json()
-                cancellation_reason = req_body.get("cancellation_reason", "")
-            except:
-                # If no request body or invalid JSON, continue without cancellation reason
-                pass
-            
-            # Cancel the order
-            result = collection.update_one(
-                {"_id": ObjectId(order_id)},
-                {
-                    "$set": {
-                        "status": "cancelled",
-                        "is_active": False,
-                        "updated_at": datetime.utcnow().isoformat(),
-                        "cancelled_at": datetime.utcnow().isoformat(),
-                        "cancelled_by": req.token_data.get("preferred_username", "unknown"),
-                        "cancellation_reason": cancellation_reason
-                    }
+            req_body = _load_body(req)
+            cancellation_reason = req_body.get("cancellation_reason", "")
+        except (ValueError, AttributeError):
+            # If no request body or invalid JSON, continue without cancellation reason
+            pass
+        
+        # Cancel the order unless it is already cancelled, stamping both fields with one timestamp
+        now_iso = datetime.utcnow().isoformat()
+        result = collection.update_one(
+            {"_id": ObjectId(order_id), "status": {"$ne": "cancelled"}},
+            {
+                "$set": {
+                    "status": "cancelled",
+                    "is_active": False,
+                    "updated_at": now_iso,
+                    "cancelled_at": now_iso,
+                    "cancelled_by": req.token_data.get("preferred_username", "unknown"),
+                    "cancellation_reason": cancellation_reason
                 }
+            }
+        )
+        
+        if result.matched_count > 0:
+            return func.HttpResponse(
+                json.dumps({"message": "Order cancelled successfully"}),
+                status_code=200,
+                mimetype="application/json"
             )
-            
-            if result.modified_count > 0:
-                return func.HttpResponse(
-                    json.dumps({"message": "Order cancelled successfully"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "No changes made to order"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
         
-        except:
+        # Nothing matched: the order is either missing or was already cancelled
+        if not collection.count_documents({"_id": ObjectId(order_id)}, limit=1):
             return func.HttpResponse(
-                json.dumps({"error": "Invalid order ID format"}),
-                status_code=400,
+                json.dumps({"error": "Order not found"}),
+                status_code=404,
                 mimetype="application/json"
             )
+        
+        return func.HttpResponse(
+            json.dumps({"message": "Order is already cancelled"}),
+            status_code=200,
+            mimetype="application/json"
+        )
     
-    except Exception as e:
-        logging.error(f"Error deleting order: {str(e)}")
+    except (PyMongoError, ValueError, KeyError) as e:
+        logging.error("Error deleting order: %s", e)
         return func.HttpResponse(
             json.dumps({"error": f"Failed to delete order: {str(e)}"}),
             status_code=500,
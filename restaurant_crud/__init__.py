@@ -7,23 +7,196 @@ Protected by Entra ID (Azure AD) authentication.
 
 import logging
 import json
+import orjson
 import azure.functions as func
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, IndexModel
 from bson import ObjectId
 import os
+import re
 from datetime import datetime
 import jwt
 import requests
+import threading
+import time
 from functools import wraps
 
-# Helper function to handle ObjectId serialization
-class JSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super(JSONEncoder, self).default(obj)
+# Try to load environment variables once, at cold start
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.info("Loaded environment variables from .env file")
+except ImportError:
+    logging.info("python-dotenv not installed, using environment variables directly")
+except Exception as e:
+    logging.warning(f"Could not load .env file: {str(e)}")
+
+# Token validation parameters, read once per worker
+_TENANT_ID = os.environ.get('AZURE_TENANT_ID')
+_AUDIENCE = os.environ.get('AZURE_APP_AUDIENCE')
+_ISSUER = f"https://login.microsoftonline.com/{_TENANT_ID}/v2.0"
+_DISCOVERY_URL = f"{_ISSUER}/.well-known/openid-configuration"
+
+# OIDC discovery documents and signing keys change rarely, so cache them per worker
+_DEFAULT_CACHE_TTL = 3600  # used when the response has no Cache-Control max-age
+_JWKS_LIFESPAN = 3600  # 1 hour
+_DISCOVERY_MIN_REFRESH = 60  # an unknown signing key refetches discovery at most this often (seconds)
+_OIDC_CACHE: dict[str, dict] = {}  # tenant -> {"data": discovery document, "exp"/"fetched": monotonic times}
+_JWK_CLIENTS: dict[str, jwt.PyJWKClient] = {}  # jwks_uri -> client with its own key cache
+_CACHE_LOCK = threading.Lock()
+_HTTP_TIMEOUT = 5  # seconds
+
+# Database client is created once per worker and reused across invocations
+_MONGO_CLIENT: MongoClient | None = None
+_RESTAURANT_COLLECTION = None
+_MONGO_LOCK = threading.Lock()
+
+# Default values for fields not provided when creating a restaurant: immutable scalars are
+# shared, while lists and dicts come from factories so each restaurant gets fresh ones
+_RESTAURANT_DEFAULTS = {
+    "is_active": True,
+    "avg_rating": 0.0,
+    "review_count": 0
+}
+_RESTAURANT_DEFAULT_FACTORIES = {
+    "location": lambda: {
+        "address": "",
+        "city": "",
+        "state": "",
+        "country": "",
+        "postal_code": "",
+        "coordinates": {
+            "latitude": 0.0,
+            "longitude": 0.0
+        }
+    },
+    "contact": lambda: {
+        "phone": "",
+        "email": "",
+        "website": ""
+    },
+    "hours": lambda: {
+        "monday": {"open": "", "close": ""},
+        "tuesday": {"open": "", "close": ""},
+        "wednesday": {"open": "", "close": ""},
+        "thursday": {"open": "", "close": ""},
+        "friday": {"open": "", "close": ""},
+        "saturday": {"open": "", "close": ""},
+        "sunday": {"open": "", "close": ""}
+    },
+    "photos": list,
+    "cuisine_types": list,
+    "features": list,
+    "menus": list,
+    "staff": list,
+    "qr_codes": list,
+    "social_media": dict
+}
+
+# Fields returned by list views unless ?fields= asks for others (fields=* returns whole restaurants)
+_LIST_PROJECTION = {
+    "name": 1, "location.city": 1, "avg_rating": 1, "review_count": 1,
+    "cuisine_types": 1, "photos": {"$slice": ["$photos", 1]}, "is_active": 1
+}
+
+# Compound indexes matching the lookups, filters and rating sort in get_restaurant
+_RESTAURANT_INDEXES = [
+    IndexModel([("owner_id", 1), ("is_active", 1)], name="owner_active"),
+    IndexModel([("name", 1), ("is_active", 1)], name="name_active"),
+    IndexModel([("is_active", 1), ("avg_rating", -1)], name="active_rating"),
+    IndexModel([("is_active", 1), ("location.city", 1), ("avg_rating", -1)], name="active_city_rating"),
+    IndexModel([("is_active", 1), ("cuisine_types", 1), ("avg_rating", -1)], name="active_cuisine_rating"),
+]
+
+# Text index backing the name/description search in get_restaurant
+_TEXT_INDEX = IndexModel([("name", "text"), ("description", "text")], name="name_description_text")
+_TEXT_SEARCH_READY = False  # fall back to a regex scan where text indexes are unavailable
+
+# Helper functions to handle ObjectId serialization (orjson handles datetime natively)
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def _dumps_restaurants(restaurants, **fields):
+    """Serialize a page of restaurants into one buffer, one document at a time"""
+    body = bytearray(b'{"restaurants":[')
+    count = len(restaurants)
+    for index, restaurant in enumerate(restaurants):
+        if index:
+            body += b","
+        body += _dumps(restaurant)
+    
+    # Append count and the pagination fields
+    body += b"]," + _dumps({"count": count, **fields})[1:]
+    return bytes(body)
+
+def _max_age(response, default):
+    """Return the Cache-Control max-age of a response in seconds, or the default"""
+    for directive in response.headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() == "max-age" and value.isdigit():
+            return int(value)
+    return default
+
+def _fetch_discovery(tenant_id, discovery_url):
+    """Fetch the tenant's OIDC discovery document, holding the lock only to swap the cached entry"""
+    response = requests.get(discovery_url, timeout=_HTTP_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    fetched = time.monotonic()
+    with _CACHE_LOCK:
+        _OIDC_CACHE[tenant_id] = {
+            "data": data,
+            "exp": fetched + _max_age(response, _DEFAULT_CACHE_TTL),
+            "fetched": fetched
+        }
+    return data
+
+def _get_discovery(tenant_id, discovery_url):
+    """Return the tenant's OIDC discovery document, fetching it only once it expires"""
+    with _CACHE_LOCK:
+        entry = _OIDC_CACHE.get(tenant_id)
+    if entry and time.monotonic() < entry["exp"]:
+        return entry["data"]
+    return _fetch_discovery(tenant_id, discovery_url)
+
+def _refresh_discovery(tenant_id, discovery_url):
+    """Refetch the discovery document early, or return None if it was fetched too recently"""
+    with _CACHE_LOCK:
+        entry = _OIDC_CACHE.get(tenant_id)
+        now = time.monotonic()
+        if entry and now - entry["fetched"] < _DISCOVERY_MIN_REFRESH:
+            return None
+        # Claim the refresh so concurrent misses don't all refetch
+        if entry:
+            _OIDC_CACHE[tenant_id] = {**entry, "fetched": now}
+    return _fetch_discovery(tenant_id, discovery_url)
+
+def _get_jwk_client(jwks_uri):
+    """Return the shared PyJWKClient for a JWKS URI, creating it on first use"""
+    with _CACHE_LOCK:
+        client = _JWK_CLIENTS.get(jwks_uri)
+        if client is None:
+            client = jwt.PyJWKClient(jwks_uri, cache_keys=True, lifespan=_JWKS_LIFESPAN, timeout=_HTTP_TIMEOUT)
+            _JWK_CLIENTS[jwks_uri] = client
+        return client
+
+def _get_signing_key(tenant_id, discovery_url, token):
+    """Return the key the token was signed with, refreshing the discovery document once if it is unknown"""
+    discovery_data = _get_discovery(tenant_id, discovery_url)
+    try:
+        # The client refetches the JWKS itself when it does not know the token's kid
+        return _get_jwk_client(discovery_data['jwks_uri']).get_signing_key_from_jwt(token)
+    except jwt.PyJWKClientError:
+        # The tenant may have moved its keys to a new JWKS URI (checked at most once a minute, since
+        # anyone can send an unknown kid); the client has already refetched the current one
+        refreshed = _refresh_discovery(tenant_id, discovery_url)
+        if refreshed is None or refreshed['jwks_uri'] == discovery_data['jwks_uri']:
+            raise
+        return _get_jwk_client(refreshed['jwks_uri']).get_signing_key_from_jwt(token)
 
 def validate_token(req):
     """Validate the Entra ID access token from the request"""
@@ -40,32 +213,19 @@ def validate_token(req):
         
         token = token_parts[1]
         
-        # Get tenant ID from environment
-        tenant_id = os.environ.get('AZURE_TENANT_ID')
-        if not tenant_id:
+        if not _TENANT_ID:
             return None, "Tenant ID is not configured"
         
-        # Get token validation parameters from environment
-        audience = os.environ.get('AZURE_APP_AUDIENCE')
-        issuer = f"https://login.microsoftonline.com/{tenant_id}/v2.0"
-        
-        # Get OIDC discovery document to get the signing keys
-        discovery_url = f"{issuer}/.well-known/openid-configuration"
-        discovery_response = requests.get(discovery_url)
-        discovery_data = discovery_response.json()
-        jwks_uri = discovery_data['jwks_uri']
-        
-        # Get the signing keys
-        jwks_response = requests.get(jwks_uri)
-        jwks_data = jwks_response.json()
+        # Get the signing key from the cached discovery document and JWKS
+        signing_key = _get_signing_key(_TENANT_ID, _DISCOVERY_URL, token)
         
         # Validate the token
         decoded_token = jwt.decode(
             token,
-            jwks_data,
+            signing_key.key,
             algorithms=['RS256'],
-            audience=audience,
-            issuer=issuer,
+            audience=_AUDIENCE,
+            issuer=_ISSUER,
             options={"verify_signature": True}
         )
         
@@ -75,13 +235,120 @@ def validate_token(req):
         return None, "Token has expired"
     except jwt.InvalidTokenError as e:
         return None, f"Invalid token: {str(e)}"
+    except jwt.PyJWKClientConnectionError as e:
+        logging.error(f"Error fetching signing keys: {str(e)}")
+        return None, f"Error validating token: {str(e)}"
+    except jwt.PyJWKClientError as e:
+        return None, f"Invalid token: {str(e)}"
     except Exception as e:
         logging.error(f"Error validating token: {str(e)}")
         return None, f"Error validating token: {str(e)}"
 
-def require_auth(func):
+def _ensure_indexes(collection):
+    """Create the restaurant indexes (idempotent); returns whether text search is available"""
+    try:
+        collection.create_indexes(_RESTAURANT_INDEXES)
+    except Exception as e:
+        logging.warning(f"Failed to create restaurant indexes: {str(e)}")
+    
+    # Created separately so a backend without text indexes still gets the others
+    try:
+        collection.create_indexes([_TEXT_INDEX])
+        return True
+    except Exception as e:
+        logging.warning(f"Failed to create restaurant text index: {str(e)}")
+        return False
+
+def _get_collection():
+    """Return the restaurant collection, connecting to the database on first use"""
+    global _MONGO_CLIENT, _RESTAURANT_COLLECTION, _TEXT_SEARCH_READY
+    
+    if _RESTAURANT_COLLECTION is not None:
+        return _RESTAURANT_COLLECTION
+    
+    with _MONGO_LOCK:
+        if _MONGO_CLIENT is None:
+            # Load database connection details
+            cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
+            database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
+            restaurant_container = os.environ.get("RESTAURANT_CONTAINER", "Restaurants")
+            
+            if not cosmos_db_connection_string:
+                return None
+            
+            # Connect to database (Cosmos DB's MongoDB API does not support retryable writes)
+            _MONGO_CLIENT = MongoClient(
+                cosmos_db_connection_string,
+                maxPoolSize=50,
+                minPoolSize=5,
+                socketTimeoutMS=30000,
+                connectTimeoutMS=30000,
+                retryWrites=False
+            )
+            collection = _MONGO_CLIENT[database_name][restaurant_container]
+            
+            # Ensure indexes exist (only attempted once per worker)
+            _TEXT_SEARCH_READY = _ensure_indexes(collection)
+            
+            _RESTAURANT_COLLECTION = collection
+    
+    return _RESTAURANT_COLLECTION
+
+def _parse_oid(value):
+    """Return value as an ObjectId, or None if it is not a valid id"""
+    return ObjectId(value) if value and ObjectId.is_valid(value) else None
+
+def _owner_filter(req, restaurant_oid):
+    """Match the restaurant only if the caller may change it (admins may change any restaurant)"""
+    if "admin" in req.token_data.get("roles", []):
+        return {"_id": restaurant_oid}
+    
+    # Callers without an oid own nothing, so there is no write to attempt
+    user_id = req.token_data.get("oid", "")
+    return {"_id": restaurant_oid, "owner_id": user_id} if user_id else None
+
+def _not_updated_response(collection, restaurant_oid, action):
+    """Explain why a guarded write matched nothing: 404 if the restaurant is missing, else 403"""
+    if collection.find_one({"_id": restaurant_oid}, {"_id": 1}) is None:
+        return func.HttpResponse(
+            json.dumps({"error": "Restaurant not found"}),
+            status_code=404,
+            mimetype="application/json"
+        )
+    
+    return func.HttpResponse(
+        json.dumps({"error": f"Unauthorized. Only owners or admins can {action} restaurants"}),
+        status_code=403,
+        mimetype="application/json"
+    )
+
+def _list_projection(req):
+    """Build the projection for list views from ?fields= (None means whole documents)"""
+    fields = req.params.get('fields', '')
+    if fields.strip() == "*":
+        return None
+    fields = [f.strip() for f in fields.split(",") if f.strip()]
+    return {f: 1 for f in fields} or _LIST_PROJECTION
+
+def _paginated_find(collection, query, skip, limit, sort=None, projection=None):
+    """Return one page of matching restaurants and the total match count in one query"""
+    items = [{"$skip": skip}, {"$limit": limit}]
+    if projection:
+        items.append({"$project": projection})
+    
+    # Sort before $facet: sub-pipelines cannot use indexes, the top-level $sort can
+    pipeline = [{"$match": query}]
+    if sort:
+        pipeline.append({"$sort": sort})
+    pipeline.append({"$facet": {"items": items, "total": [{"$count": "n"}]}})
+    
+    result = next(collection.aggregate(pipeline))
+    total_count = result["total"][0]["n"] if result["total"] else 0
+    return result["items"], total_count
+
+def require_auth(handler):
     """Decorator to require authentication for an endpoint"""
-    @wraps(func)
+    @wraps(handler)
     def wrapper(req, collection):
         # Validate the token
         token_data, error = validate_token(req)
@@ -97,7 +364,7 @@ def require_auth(func):
         req.token_data = token_data
         
         # Call the original function
-        return func(req, collection)
+        return handler(req, collection)
     
     return wrapper
 
@@ -105,56 +372,30 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('Processing restaurant CRUD operation.')
     
     try:
-        # Try to load environment variables
-        try:
-            from dotenv import load_dotenv
-            load_dotenv()
-            logging.info("Loaded environment variables from .env file")
-        except ImportError:
-            logging.info("python-dotenv not installed, using environment variables directly")
-        except Exception as e:
-            logging.warning(f"Could not load .env file: {str(e)}")
-        
-        # Load database connection details
-        cosmos_db_connection_string = os.environ.get("COSMOS_DB_CONNECTION_STRING")
-        database_name = os.environ.get("DATABASE_NAME", "PromptMenuDB")
-        restaurant_container = os.environ.get("RESTAURANT_CONTAINER", "Restaurants")
-        
-        if not cosmos_db_connection_string:
+        # Reuse the worker's database connection
+        restaurant_collection = _get_collection()
+        
+        if restaurant_collection is None:
             return func.HttpResponse(
                 json.dumps({"error": "Database connection string is not configured"}),
                 status_code=500,
                 mimetype="application/json"
             )
         
-        # Connect to database
-        client = MongoClient(
-            cosmos_db_connection_string,
-            socketTimeoutMS=30000,
-            connectTimeoutMS=30000
-        )
-        database = client[database_name]
-        restaurant_collection = database[restaurant_container]
-        
         # Get operation type from route or query parameter
         route = req.route_params.get('operation', '')
         operation = route if route else req.params.get('operation', 'get')
         
         # Handle different CRUD operations
-        if req.method == 'POST' and operation.lower() == 'create':
-            return create_restaurant(req, restaurant_collection)
-        elif req.method == 'GET' and operation.lower() == 'get':
-            return get_restaurant(req, restaurant_collection)
-        elif req.method == 'PUT' and operation.lower() == 'update':
-            return update_restaurant(req, restaurant_collection)
-        elif req.method == 'DELETE' and operation.lower() == 'delete':
-            return delete_restaurant(req, restaurant_collection)
-        else:
+        handler = _DISPATCH.get((req.method, operation.lower()))
+        if handler is None:
             return func.HttpResponse(
                 json.dumps({"error": f"Unsupported operation: {operation}"}),
                 status_code=400,
                 mimetype="application/json"
             )
+        
+        return handler(req, restaurant_collection)
     
     except Exception as e:
         logging.error(f"Error processing restaurant operation: {str(e)}")
@@ -191,67 +432,17 @@ def create_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
         if "owner_id" not in req_body:
             req_body["owner_id"] = req.token_data.get("oid", "")
         
-        # Set default values if not provided
-        if "is_active" not in req_body:
-            req_body["is_active"] = True
-        
-        # Initialize default location structure if not provided
-        if "location" not in req_body:
-            req_body["location"] = {
-                "address": "",
-                "city": "",
-                "state": "",
-                "country": "",
-                "postal_code": "",
-                "coordinates": {
-                    "latitude": 0.0,
-                    "longitude": 0.0
-                }
-            }
-        
-        # Initialize default contact structure if not provided
-        if "contact" not in req_body:
-            req_body["contact"] = {
-                "phone": "",
-                "email": "",
-                "website": ""
-            }
-        
-        # Initialize default hours structure if not provided
-        if "hours" not in req_body:
-            req_body["hours"] = {
-                "monday": {"open": "", "close": ""},
-                "tuesday": {"open": "", "close": ""},
-                "wednesday": {"open": "", "close": ""},
-                "thursday": {"open": "", "close": ""},
-                "friday": {"open": "", "close": ""},
-                "saturday": {"open": "", "close": ""},
-                "sunday": {"open": "", "close": ""}
-            }
-        
-        # Initialize empty arrays for relationship fields if not provided
-        for field in ["photos", "cuisine_types", "features", "menus", "staff", "qr_codes"]:
+        # Fill in defaults for any fields that were not provided (building only the missing containers)
+        req_body = {**_RESTAURANT_DEFAULTS, **req_body}
+        for field, factory in _RESTAURANT_DEFAULT_FACTORIES.items():
             if field not in req_body:
-                req_body[field] = []
+                req_body[field] = factory()
         
-        # Initialize empty object for social media if not provided
-        if "social_media" not in req_body:
-            req_body["social_media"] = {}
-        
-        # Set default rating values if not provided
-        if "avg_rating" not in req_body:
-            req_body["avg_rating"] = 0.0
-        if "review_count" not in req_body:
-            req_body["review_count"] = 0
-        
-        # Create the restaurant
-        result = collection.insert_one(req_body)
-        
-        # Get created restaurant with _id
-        created_restaurant = collection.find_one({"_id": result.inserted_id})
+        # Create the restaurant (insert_one adds the new _id to req_body)
+        collection.insert_one(req_body)
         
         return func.HttpResponse(
-            json.dumps({"message": "Restaurant created successfully", "restaurant": created_restaurant}, cls=JSONEncoder),
+            _dumps({"message": "Restaurant created successfully", "restaurant": req_body}),
             status_code=201,
             mimetype="application/json"
         )
@@ -281,15 +472,16 @@ def get_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
         
         # If an ID was provided, get restaurant by ID
         if restaurant_id:
-            try:
-                restaurant = collection.find_one({"_id": ObjectId(restaurant_id), "is_active": True})
-            except:
+            restaurant_oid = _parse_oid(restaurant_id)
+            if restaurant_oid is None:
                 return func.HttpResponse(
                     json.dumps({"error": "Invalid restaurant ID format"}),
                     status_code=400,
                     mimetype="application/json"
                 )
             
+            restaurant = collection.find_one({"_id": restaurant_oid, "is_active": True})
+            
             if not restaurant:
                 return func.HttpResponse(
                     json.dumps({"error": "Restaurant not found"}),
@@ -298,7 +490,7 @@ def get_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
                 )
             
             return func.HttpResponse(
-                json.dumps({"restaurant": restaurant}, cls=JSONEncoder),
+                _dumps({"restaurant": restaurant}),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -315,7 +507,7 @@ def get_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
                 )
             
             return func.HttpResponse(
-                json.dumps({"restaurant": restaurant}, cls=JSONEncoder),
+                _dumps({"restaurant": restaurant}),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -327,18 +519,18 @@ def get_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
             limit = int(req.params.get('limit', 10))
             skip = (page - 1) * limit
             
-            # Query for restaurants by owner
-            restaurants = list(collection.find({"owner_id": owner_id, "is_active": True}).skip(skip).limit(limit))
-            total_count = collection.count_documents({"owner_id": owner_id, "is_active": True})
+            # Query for restaurants by owner (page and total count in one round trip)
+            restaurants, total_count = _paginated_find(
+                collection, {"owner_id": owner_id, "is_active": True}, skip, limit, projection=_list_projection(req)
+            )
             
             return func.HttpResponse(
-                json.dumps({
-                    "restaurants": restaurants,
-                    "count": len(restaurants),
-                    "total_count": total_count,
-                    "page": page,
-                    "total_pages": (total_count + limit - 1) // limit
-                }, cls=JSONEncoder),
+                _dumps_restaurants(
+                    restaurants,
+                    total_count=total_count,
+                    page=page,
+                    total_pages=(total_count + limit - 1) // limit
+                ),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -366,27 +558,32 @@ def get_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
                 query["location.city"] = city
             
             if search_term:
-                # Text search on name and description
-                query["$or"] = [
-                    {"name": {"$regex": search_term, "$options": "i"}},
-                    {"description": {"$regex": search_term, "$options": "i"}}
-                ]
+                if _TEXT_SEARCH_READY:
+                    # Text search on name and description
+                    query["$text"] = {"$search": search_term}
+                else:
+                    # Without a text index, substring match on name and description (a collection scan)
+                    pattern = re.escape(search_term)
+                    query["$or"] = [
+                        {"name": {"$regex": pattern, "$options": "i"}},
+                        {"description": {"$regex": pattern, "$options": "i"}}
+                    ]
             
             if rating_min:
                 query["avg_rating"] = {"$gte": float(rating_min)}
             
-            # Execute query with pagination
-            restaurants = list(collection.find(query).sort("avg_rating", -1).skip(skip).limit(limit))
-            total_count = collection.count_documents(query)
+            # Execute query with pagination (page and total count in one round trip)
+            restaurants, total_count = _paginated_find(
+                collection, query, skip, limit, {"avg_rating": -1}, _list_projection(req)
+            )
             
             return func.HttpResponse(
-                json.dumps({
-                    "restaurants": restaurants,
-                    "count": len(restaurants),
-                    "total_count": total_count,
-                    "page": page,
-                    "total_pages": (total_count + limit - 1) // limit
-                }, cls=JSONEncoder),
+                _dumps_restaurants(
+                    restaurants,
+                    total_count=total_count,
+                    page=page,
+                    total_pages=(total_count + limit - 1) // limit
+                ),
                 status_code=200,
                 mimetype="application/json"
             )
@@ -413,6 +610,15 @@ def update_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
+        # Reject malformed IDs before touching the database
+        restaurant_oid = _parse_oid(restaurant_id)
+        if restaurant_oid is None:
+            return func.HttpResponse(
+                json.dumps({"error": "Invalid restaurant ID format"}),
+                status_code=400,
+                mimetype="application/json"
+            )
+        
         # Get request body
         req_body = req.get_json()
         
@@ -430,56 +636,24 @@ def update_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
             if field in req_body:
                 del req_body[field]
         
-        try:
-            # Check if restaurant exists and user is authorized
-            existing_restaurant = collection.find_one({"_id": ObjectId(restaurant_id)})
-            if not existing_restaurant:
-                return func.HttpResponse(
-                    json.dumps({"error": "Restaurant not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Verify ownership or admin privileges (if owner_id is in token claims)
-            user_id = req.token_data.get("oid", "")
-            is_admin = "admin" in req.token_data.get("roles", [])
-            is_owner = user_id and user_id == existing_restaurant.get("owner_id")
-            
-            if not (is_admin or is_owner):
-                return func.HttpResponse(
-                    json.dumps({"error": "Unauthorized. Only owners or admins can update restaurants"}),
-                    status_code=403,
-                    mimetype="application/json"
-                )
-            
-            # Update the restaurant
-            result = collection.update_one(
-                {"_id": ObjectId(restaurant_id)},
-                {"$set": req_body}
+        # Update the restaurant only if the caller owns it or is an admin, and get it back in one round trip
+        filter_ = _owner_filter(req, restaurant_oid)
+        updated_restaurant = None
+        if filter_ is not None:
+            updated_restaurant = collection.find_one_and_update(
+                filter_,
+                {"$set": req_body},
+                return_document=ReturnDocument.AFTER
             )
-            
-            if result.modified_count > 0:
-                # Get updated restaurant
-                updated_restaurant = collection.find_one({"_id": ObjectId(restaurant_id)})
-                
-                return func.HttpResponse(
-                    json.dumps({"message": "Restaurant updated successfully", "restaurant": updated_restaurant}, cls=JSONEncoder),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "No changes made to restaurant"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
         
-        except:
-            return func.HttpResponse(
-                json.dumps({"error": "Invalid restaurant ID format"}),
-                status_code=400,
-                mimetype="application/json"
-            )
+        if updated_restaurant is None:
+            return _not_updated_response(collection, restaurant_oid, "update")
+        
+        return func.HttpResponse(
+            _dumps({"message": "Restaurant updated successfully", "restaurant": updated_restaurant}),
+            status_code=200,
+            mimetype="application/json"
+        )
     
     except ValueError:
         return func.HttpResponse(
@@ -509,60 +683,49 @@ def delete_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
-        try:
-            # Check if restaurant exists and user is authorized
-            existing_restaurant = collection.find_one({"_id": ObjectId(restaurant_id)})
-            if not existing_restaurant:
-                return func.HttpResponse(
-                    json.dumps({"error": "Restaurant not found"}),
-                    status_code=404,
-                    mimetype="application/json"
-                )
-            
-            # Verify ownership or admin privileges (if owner_id is in token claims)
-            user_id = req.token_data.get("oid", "")
-            is_admin = "admin" in req.token_data.get("roles", [])
-            is_owner = user_id and user_id == existing_restaurant.get("owner_id")
-            
-            if not (is_admin or is_owner):
-                return func.HttpResponse(
-                    json.dumps({"error": "Unauthorized. Only owners or admins can delete restaurants"}),
-                    status_code=403,
-                    mimetype="application/json"
-                )
-            
-            # Soft delete (mark as inactive) with user info
-            result = collection.update_one(
-                {"_id": ObjectId(restaurant_id)},
-                {
-                    "$set": {
-                        "is_active": False,
-                        "updated_at": datetime.utcnow().isoformat(),
-                        "deleted_by": req.token_data.get("preferred_username", "unknown"),
-                        "deleted_at": datetime.utcnow().isoformat()
-                    }
-                }
-            )
-            
-            if result.modified_count > 0:
-                return func.HttpResponse(
-                    json.dumps({"message": "Restaurant deleted successfully"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"message": "Restaurant was already marked as deleted"}),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-        
-        except:
+        # Reject malformed IDs before touching the database
+        restaurant_oid = _parse_oid(restaurant_id)
+        if restaurant_oid is None:
             return func.HttpResponse(
                 json.dumps({"error": "Invalid restaurant ID format"}),
                 status_code=400,
                 mimetype="application/json"
             )
+        
+        # Only the owner or an admin may delete the restaurant
+        filter_ = _owner_filter(req, restaurant_oid)
+        if filter_ is None:
+            return _not_updated_response(collection, restaurant_oid, "delete")
+        
+        # Soft delete (mark as inactive) with user info, stamping both fields with one timestamp
+        now_iso = datetime.utcnow().isoformat()
+        result = collection.update_one(
+            filter_,
+            {
+                "$set": {
+                    "is_active": False,
+                    "updated_at": now_iso,
+                    "deleted_by": req.token_data.get("preferred_username", "unknown"),
+                    "deleted_at": now_iso
+                }
+            }
+        )
+        
+        if result.matched_count == 0:
+            return _not_updated_response(collection, restaurant_oid, "delete")
+        
+        if result.modified_count > 0:
+            return func.HttpResponse(
+                json.dumps({"message": "Restaurant deleted successfully"}),
+                status_code=200,
+                mimetype="application/json"
+            )
+        else:
+            return func.HttpResponse(
+                json.dumps({"message": "Restaurant was already marked as deleted"}),
+                status_code=200,
+                mimetype="application/json"
+            )
     
     except Exception as e:
         logging.error(f"Error deleting restaurant: {str(e)}")
@@ -570,4 +733,12 @@ def delete_restaurant(req: func.HttpRequest, collection) -> func.HttpResponse:
             json.dumps({"error": f"Failed to delete restaurant: {str(e)}"}),
             status_code=500,
             mimetype="application/json"
-        )
\ No newline at end of file
+        )
+
+# Map (HTTP method, operation) to the handler for that CRUD operation
+_DISPATCH = {
+    ("POST", "create"): create_restaurant,
+    ("GET", "get"): get_restaurant,
+    ("PUT", "update"): update_restaurant,
+    ("DELETE", "delete"): delete_restaurant,
+}